@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Shared asyncio kline fetch engine
+Keeps up to N page requests in flight and hands pages back in plan order,
+so callers can feed the result straight into their convert_to_dataframe
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from binance_api import KLINES_ENDPOINT, MAX_LIMIT
+from http_client import HTTP_CLIENT
+from kline_builder import KlineColumnBuilder
+from kline_parser import parse_klines
+from page_planner import candle_count, plan_pages
+from rate_limiter import BINANCE_LIMITER, rate_limited_get
+
+
+class AsyncKlineFetcher:
+    def __init__(self, symbol="BTCUSDT", interval="1h", limit=MAX_LIMIT,
+                 max_in_flight=8, timeout=30, max_retries=5, limiter=None, decode='json'):
+        """
+        decode='json' returns pages as lists of klines (response.json());
+        decode='columns' parses the raw bytes straight into a typed KlinePage.
+        """
+        self.symbol = symbol
+        self.interval = interval
+        self.limit = limit
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.limiter = limiter or BINANCE_LIMITER
+        self.decode = decode
+        self.request_count = 0
+        self.lock = threading.Lock()  # fetch_page runs in up to max_in_flight worker threads
+        self.failed_windows = []
+
+    def plan_windows(self, start_ms, end_ms, reverse=False):
+        """
+        Split [start_ms, end_ms] into page-aligned windows of exactly `limit`
+        candles each (see page_planner). With reverse=True the newest window
+        comes first (backwards crawls).
+        """
+        windows = plan_pages(start_ms, end_ms, self.interval, self.limit)
+        if reverse:
+            windows.reverse()
+        return windows
+
+    def fetch_page(self, start_ms, end_ms):
+        """Blocking fetch of one page window with retry logic"""
+        params = {
+            'symbol': self.symbol,
+            'interval': self.interval,
+            'limit': self.limit,
+            'startTime': start_ms,
+            'endTime': end_ms
+        }
+
+        for attempt in range(self.max_retries):
+            try:
+                response = rate_limited_get(KLINES_ENDPOINT, params=params, limiter=self.limiter,
+                                            timeout=self.timeout)
+                with self.lock:
+                    self.request_count += 1
+                if response.status_code in (418, 429):
+                    if attempt == self.max_retries - 1:
+                        print(f"   ❌ Page {start_ms}-{end_ms} failed after {self.max_retries} attempts: "
+                              f"rate limited (HTTP {response.status_code}, "
+                              f"Retry-After {response.headers.get('Retry-After', 'n/a')})")
+                        return None
+                    # The shared limiter now holds every request until Retry-After
+                    continue
+
+                response.raise_for_status()
+                if self.decode == 'columns':
+                    return parse_klines(response.content)
+                return response.json()
+
+            except Exception as e:
+                if attempt == self.max_retries - 1:
+                    print(f"   ❌ Page {start_ms}-{end_ms} failed after {self.max_retries} attempts: {e}")
+                    return None
+                wait_time = 2 ** attempt
+                print(f"   ⚠️  Attempt {attempt + 1} failed, retrying in {wait_time}s...")
+                time.sleep(wait_time)
+
+        return None
+
+    async def iter_pages(self, windows, stop_on_empty=False):
+        """
+        Async generator yielding (window, page) in the order of `windows`
+        while up to max_in_flight requests run concurrently.
+        A page of None means the window failed after all retries.
+        """
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=self.max_in_flight)
+        windows = iter(windows)
+        pending = deque()
+
+        def schedule():
+            while len(pending) < self.max_in_flight:
+                window = next(windows, None)
+                if window is None:
+                    return
+                pending.append((window, loop.run_in_executor(executor, self.fetch_page, *window)))
+
+        try:
+            schedule()
+            while pending:
+                window, future = pending.popleft()
+                page = await future
+                if stop_on_empty and page is not None and len(page) == 0:
+                    return
+                schedule()
+                yield window, page
+        finally:
+            for _, future in pending:
+                future.cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def fetch_pages(self, windows, stop_on_empty=False, on_page=None, keep_pages=True,
+                          stop_on_failure=False):
+        """Collect all pages for `windows` in order; returns (pages, failed_windows)"""
+        pages = []
+        failed = []
+        async for window, page in self.iter_pages(windows, stop_on_empty=stop_on_empty):
+            if page is None:
+                failed.append(window)
+                if stop_on_failure:
+                    break
+                continue
+            if on_page:
+                on_page(window, page)
+            if page and keep_pages:
+                pages.append(page)
+        return pages, failed
+
+    def fetch_range(self, start_ms, end_ms, reverse=False, stop_on_empty=False, verbose=True,
+                    on_page=None, keep_pages=True, stop_on_failure=False):
+        """
+        Fetch every candle in [start_ms, end_ms] and return one flat kline list
+        sorted by open time, ready for convert_to_dataframe.
+        `on_page(window, page)` sees every page as soon as it is in order;
+        with keep_pages=False nothing is accumulated and [] is returned.
+        stop_on_failure=True ends the crawl at the first failed page so that
+        checkpointing callers never commit past a hole.
+        """
+        windows = self.plan_windows(start_ms, end_ms, reverse=reverse)
+        total = len(windows)
+        done = [0]
+
+        def report(window, page):
+            done[0] += 1
+            if verbose:
+                window_date = datetime.fromtimestamp(window[0] / 1000).strftime('%Y-%m-%d %H:%M')
+                print(f"📦 Page {done[0]}/{total}: {window_date} +{len(page)} candles")
+            if on_page:
+                on_page(window, page)
+
+        if verbose:
+            print(f"🚀 Fetching {total} pages with up to {self.max_in_flight} in flight...")
+
+        pages, failed = asyncio.run(self.fetch_pages(windows, stop_on_empty=stop_on_empty,
+                                                     on_page=report, keep_pages=keep_pages,
+                                                     stop_on_failure=stop_on_failure))
+        self.failed_windows = failed
+
+        if failed:
+            print(f"⚠️  {len(failed)} page(s) failed: {failed}")
+        if verbose:
+            HTTP_CLIENT.print_stats()
+
+        if reverse:
+            pages.reverse()
+
+        all_data = []
+        for page in pages:
+            all_data.extend(page)
+        return all_data
+
+    def fetch_columns(self, start_ms, end_ms, reverse=False, stop_on_empty=False, verbose=True,
+                      max_bytes=None, on_spill=None):
+        """
+        Like fetch_range, but every page goes straight into typed column
+        arrays preallocated for the exact planned candle count. Returns the
+        KlineColumnBuilder; call .to_dataframe(sort=True) on it.
+        """
+        planned_rows = candle_count(start_ms, end_ms, self.interval)
+        builder = KlineColumnBuilder(capacity=planned_rows, max_bytes=max_bytes, on_spill=on_spill)
+        self.fetch_range(start_ms, end_ms, reverse=reverse, stop_on_empty=stop_on_empty, verbose=verbose,
+                         on_page=lambda window, page: builder.append_page(page), keep_pages=False)
+        return builder
@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Event-driven bar-by-bar backtester
+For path-dependent strategies (trailing stops, pyramiding, OCO brackets)
+that backtest_vectorized cannot express. The engine walks the stored
+candle columns once, calling strategy.on_bar(engine, i) at every close.
+
+Orders submitted at bar i become active from bar i+1: market orders fill
+at its open, stop/limit orders trigger intrabar against high/low (a gap
+through the price fills at the open). If a stop and a limit both trigger
+in the same bar the stop is assumed to have hit first. Orders are
+`__slots__` objects, fills go into a preallocated structured array and
+the per-bar loop itself allocates nothing but floats.
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from backtest_vectorized import load_bars, max_drawdown, sharpe_ratio, synthetic_bars
+
+MARKET, STOP, TRAILING, LIMIT = 0, 1, 2, 3  # Also the intrabar processing order
+KIND_NAMES = {MARKET: 'market', STOP: 'stop', TRAILING: 'trailing', LIMIT: 'limit'}
+PENDING, FILLED, CANCELLED = 0, 1, 2
+
+FILL_DTYPE = np.dtype([
+    ('bar', np.int64), ('order_id', np.int64), ('kind', np.int8), ('side', np.int8),
+    ('quantity', np.float64), ('price', np.float64), ('fee', np.float64), ('realized_pnl', np.float64),
+])
+
+
+class Order:
+    __slots__ = ('id', 'side', 'quantity', 'kind', 'price', 'trail', 'oco', 'flatten', 'status', 'bar')
+
+    def __init__(self, order_id, side, quantity, kind, price, trail, flatten, bar):
+        self.id = order_id
+        self.side = side  # +1 buy, -1 sell
+        self.quantity = quantity
+        self.kind = kind
+        self.price = price  # Stop/limit trigger (current stop for trailing)
+        self.trail = trail  # Trailing distance as a fraction of price
+        self.oco = None  # Sibling cancelled when this one fills
+        self.flatten = flatten  # Quantity = whole position at fill time
+        self.status = PENDING
+        self.bar = bar  # Bar it was submitted at
+
+
+class Position:
+    __slots__ = ('units', 'average_price', 'realized_pnl')
+
+    def __init__(self):
+        self.units = 0.0  # Signed quantity
+        self.average_price = 0.0
+        self.realized_pnl = 0.0
+
+
+class Strategy:
+    """Base strategy - does nothing (the engine's overhead baseline)"""
+
+    def start(self, engine):
+        """Called once before the first bar; precompute vectorized signals here"""
+
+    def on_bar(self, engine, i):
+        """Called at the close of bar i"""
+
+    def on_fill(self, engine, order, price):
+        """Called when an order fills (new orders are active from the next bar)"""
+
+
+class EventBacktester:
+    def __init__(self, columns, strategy, fee=0.001, slippage=0.0005, initial_cash=10000.0, interval='1h'):
+        self.columns = columns
+        self.strategy = strategy
+        self.fee = fee
+        self.slippage = slippage  # Fraction of price on market and stop fills
+        self.initial_cash = initial_cash
+        self.interval = interval
+
+        # Python lists index far faster than NumPy scalars in the bar loop
+        self.open = np.asarray(columns['open'], dtype=np.float64).tolist()
+        self.high = np.asarray(columns.get('high', columns['open']), dtype=np.float64).tolist()
+        self.low = np.asarray(columns.get('low', columns['open']), dtype=np.float64).tolist()
+        self.close = np.asarray(columns['close'], dtype=np.float64).tolist()
+        self.bars = len(self.close)
+
+        self.cash = initial_cash
+        self.position = Position()
+        self.pending = []  # Active orders, sorted by kind
+        self.incoming = []  # Submitted this bar, active from the next one
+        self.next_order_id = 0
+        self.i = -1
+        self.equity_curve = np.empty(self.bars)
+        self.fills = np.empty(1024, dtype=FILL_DTYPE)
+        self.fill_count = 0
+
+    @property
+    def equity(self):
+        """Equity at the current bar's close"""
+        return self.cash + self.position.units * self.close[self.i]
+
+    # --- Order API -------------------------------------------------------
+
+    def _submit(self, side, quantity, kind, price=None, trail=None, flatten=False):
+        order = Order(self.next_order_id, side, quantity, kind, price, trail, flatten, self.i)
+        self.next_order_id += 1
+        if kind == TRAILING:
+            reference = price if price is not None else self.close[self.i]
+            order.price = reference * (1 - trail) if side < 0 else reference * (1 + trail)
+        self.incoming.append(order)
+        return order
+
+    def buy(self, quantity, stop=None, limit=None):
+        if stop is not None:
+            return self._submit(1, quantity, STOP, stop)
+        if limit is not None:
+            return self._submit(1, quantity, LIMIT, limit)
+        return self._submit(1, quantity, MARKET)
+
+    def sell(self, quantity, stop=None, limit=None):
+        if stop is not None:
+            return self._submit(-1, quantity, STOP, stop)
+        if limit is not None:
+            return self._submit(-1, quantity, LIMIT, limit)
+        return self._submit(-1, quantity, MARKET)
+
+    def trailing_stop(self, trail, quantity=None, reference=None):
+        """
+        Trailing stop against the current position (whole position by
+        default), starting `trail` away from `reference` (default: close)
+        """
+        side = -1 if self.position.units > 0 else 1
+        return self._submit(side, quantity or 0.0, TRAILING, reference, trail, flatten=quantity is None)
+
+    def close_position(self, stop=None, limit=None):
+        """Flatten the position at the next open (or at a stop/limit)"""
+        side = -1 if self.position.units > 0 else 1
+        kind = STOP if stop is not None else LIMIT if limit is not None else MARKET
+        return self._submit(side, 0.0, kind, stop if stop is not None else limit, flatten=True)
+
+    def oco(self, first, second):
+        """Link two orders so that filling one cancels the other"""
+        first.oco, second.oco = second, first
+
+    def cancel(self, order):
+        order.status = CANCELLED
+
+    def cancel_all(self):
+        for order in self.pending:
+            order.status = CANCELLED
+        for order in self.incoming:
+            order.status = CANCELLED
+
+    # --- Matching ----------------------------------------------------------
+
+    def _fill(self, order, price, i):
+        position = self.position
+        if order.flatten:
+            if position.units == 0 or (position.units > 0) == (order.side > 0):
+                order.status = CANCELLED  # Nothing (left) to close
+                return
+            quantity = abs(position.units)
+        else:
+            quantity = order.quantity
+        if order.kind != LIMIT:
+            price *= 1 + order.side * self.slippage
+        fee = quantity * price * self.fee
+        signed = order.side * quantity
+
+        # Average entry price and realized PnL of the signed position
+        units = position.units
+        realized = 0.0
+        if units == 0 or (units > 0) == (signed > 0):
+            position.average_price = (position.average_price * abs(units) + price * quantity) / (abs(units) + quantity)
+        else:
+            closed = min(quantity, abs(units))
+            realized = closed * (price - position.average_price) * (1 if units > 0 else -1)
+            if quantity > abs(units):
+                position.average_price = price  # Reversed through flat
+            elif quantity == abs(units):
+                position.average_price = 0.0
+        position.units = units + signed
+        position.realized_pnl += realized - fee
+        self.cash -= signed * price + fee
+
+        order.status = FILLED
+        if order.oco is not None:
+            order.oco.status = CANCELLED
+
+        if self.fill_count == len(self.fills):
+            self.fills = np.resize(self.fills, 2 * len(self.fills))
+        self.fills[self.fill_count] = (i, order.id, order.kind, order.side, quantity, price, fee, realized)
+        self.fill_count += 1
+        self.strategy.on_fill(self, order, price)
+
+    def _process_orders(self, i):
+        o, h, l = self.open[i], self.high[i], self.low[i]
+        changed = False
+        for order in self.pending:
+            if order.status != PENDING:
+                changed = True
+                continue
+            kind, side, price = order.kind, order.side, order.price
+            if kind == MARKET:
+                self._fill(order, o, i)
+            elif kind == LIMIT:
+                if side > 0 and l <= price:
+                    self._fill(order, min(o, price), i)
+                elif side < 0 and h >= price:
+                    self._fill(order, max(o, price), i)
+            else:
+                if side > 0 and h >= price:
+                    self._fill(order, max(o, price), i)
+                elif side < 0 and l <= price:
+                    self._fill(order, min(o, price), i)
+                elif kind == TRAILING:
+                    # Ratchet after the bar: the new stop is live from the next bar
+                    if side < 0:
+                        order.price = max(price, h * (1 - order.trail))
+                    else:
+                        order.price = min(price, l * (1 + order.trail))
+            if order.status != PENDING:
+                changed = True
+        if changed:
+            self.pending = [order for order in self.pending if order.status == PENDING]
+
+    def run(self):
+        self.strategy.start(self)
+        close = self.close
+        equity_curve = self.equity_curve
+        position = self.position
+        on_bar = self.strategy.on_bar
+        for i in range(self.bars):
+            self.i = i
+            if self.incoming:
+                self.pending.extend(order for order in self.incoming if order.status == PENDING)
+                self.pending.sort(key=lambda order: order.kind)
+                self.incoming.clear()
+            if self.pending:
+                self._process_orders(i)
+            equity_curve[i] = self.cash + position.units * close[i]
+            on_bar(self, i)
+        return EventResult(equity_curve, self.fills[:self.fill_count].copy(), self.initial_cash,
+                           self.interval, self.columns.get('open_time'))
+
+
+class EventResult:
+    def __init__(self, equity, fills, initial_cash, interval, open_time=None):
+        self.equity = equity
+        self.fill_records = fills
+        self.initial_cash = initial_cash
+        self.interval = interval
+        self.open_time = open_time
+
+    @property
+    def bars(self):
+        return len(self.equity)
+
+    @property
+    def returns(self):
+        return self.equity / np.r_[self.initial_cash, self.equity[:-1]] - 1
+
+    @property
+    def total_return(self):
+        return self.equity[-1] / self.initial_cash - 1 if self.bars else 0.0
+
+    @property
+    def max_drawdown(self):
+        return max_drawdown(self.equity)
+
+    @property
+    def sharpe(self):
+        return sharpe_ratio(self.returns, self.interval)
+
+    def fills(self):
+        df = pd.DataFrame(self.fill_records)
+        df['kind'] = df['kind'].map(KIND_NAMES)
+        df['side'] = np.where(df['side'] > 0, 'buy', 'sell')
+        if self.open_time is not None:
+            df.insert(0, 'time', pd.to_datetime(np.asarray(self.open_time)[df['bar']], unit='ms'))
+        return df
+
+    def summary(self):
+        realized = self.fill_records['realized_pnl']
+        closing = realized != 0
+        win_rate = np.mean(realized[closing] > 0) if closing.any() else 0.0
+        return "\n".join([
+            f"📈 Bars: {self.bars:,} ({self.interval})",
+            f"💰 Total return: {self.total_return:+.2%}",
+            f"📉 Max drawdown: {self.max_drawdown:.2%}",
+            f"⚖️  Sharpe: {self.sharpe:.2f}",
+            f"🔁 Fills: {len(self.fill_records):,} (win rate of closing fills {win_rate:.1%})",
+            f"🧾 Fees: {self.fill_records['fee'].sum():,.2f}",
+        ])
+
+
+class BreakoutTrailingStrategy(Strategy):
+    """Buy new `lookback`-bar closing highs, pyramid up to `max_units` entries, exit on a trailing stop"""
+
+    def __init__(self, lookback=48, trail=0.05, max_units=3, add_every=0.02, risk=0.9):
+        self.lookback = lookback
+        self.trail = trail
+        self.max_units = max_units
+        self.add_every = add_every  # Rise over the last entry before adding
+        self.risk = risk  # Fraction of equity across all units
+        self.entries = 0
+        self.last_entry = 0.0
+        self.stop = None
+
+    def start(self, engine):
+        close = np.asarray(engine.close)
+        highest = np.full(len(close), np.inf)
+        if len(close) > self.lookback:
+            windows = np.lib.stride_tricks.sliding_window_view(close, self.lookback)
+            highest[self.lookback:] = windows.max(axis=1)[:-1]  # Max of the previous `lookback` closes
+        self.breakout = (close > highest).tolist()
+
+    def on_bar(self, engine, i):
+        close = engine.close[i]
+        if engine.position.units == 0:
+            if self.breakout[i]:
+                engine.buy(engine.equity * self.risk / self.max_units / close)
+                self.entries, self.last_entry = 1, close
+        elif self.entries < self.max_units and close > self.last_entry * (1 + self.add_every):
+            engine.buy(engine.equity * self.risk / self.max_units / close)
+            self.entries, self.last_entry = self.entries + 1, close
+
+    def on_fill(self, engine, order, price):
+        if order.kind == MARKET and self.stop is None:
+            self.stop = engine.trailing_stop(self.trail, reference=price)
+        elif order.kind == TRAILING:
+            self.entries, self.stop = 0, None
+
+
+class BracketStrategy(Strategy):
+    """Enter on SMA crossovers with an OCO take-profit / stop-loss bracket"""
+
+    def __init__(self, fast=24, slow=168, take_profit=0.04, stop_loss=0.02):
+        self.fast = fast
+        self.slow = slow
+        self.take_profit = take_profit
+        self.stop_loss = stop_loss
+
+    def start(self, engine):
+        from backtest_vectorized import sma_cross_positions
+        signal = sma_cross_positions(engine.close, self.fast, self.slow)
+        self.crosses = np.r_[0.0, np.diff(signal)].tolist()
+
+    def on_bar(self, engine, i):
+        cross = self.crosses[i]
+        if cross and engine.position.units == 0:
+            quantity = engine.equity * 0.95 / engine.close[i]
+            if cross > 0:
+                engine.buy(quantity)
+            else:
+                engine.sell(quantity)
+
+    def on_fill(self, engine, order, price):
+        if order.kind != MARKET or engine.position.units == 0:
+            return
+        if engine.position.units > 0:
+            target = engine.close_position(limit=price * (1 + self.take_profit))
+            stop = engine.close_position(stop=price * (1 - self.stop_loss))
+        else:
+            target = engine.close_position(limit=price * (1 - self.take_profit))
+            stop = engine.close_position(stop=price * (1 + self.stop_loss))
+        engine.oco(target, stop)
+
+
+STRATEGIES = {
+    'noop': Strategy,
+    'breakout': BreakoutTrailingStrategy,
+    'bracket': BracketStrategy,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Event-driven backtest and bars/sec benchmark")
+    parser.add_argument("--symbol", default="BTCUSDT")
+    parser.add_argument("--interval", default="1h")
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES), action="append",
+                        help="Strategy to run (repeatable; default: all)")
+    parser.add_argument("--fee", type=float, default=0.001)
+    parser.add_argument("--slippage", type=float, default=0.0005)
+    parser.add_argument("--synthetic", type=int, help="Benchmark on N synthetic 1m bars instead of the store")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        bars, interval = synthetic_bars(args.synthetic), '1m'
+        spread = np.abs(bars['close'] - bars['open'])
+        bars['high'] = np.maximum(bars['open'], bars['close']) + spread
+        bars['low'] = np.minimum(bars['open'], bars['close']) - spread
+    else:
+        bars, interval = load_bars(args.symbol, args.interval), args.interval
+    if len(bars['close']) == 0:
+        print(f"❌ No stored {args.symbol} {args.interval} candles")
+        return
+
+    for name in args.strategy or list(STRATEGIES):
+        engine = EventBacktester(bars, STRATEGIES[name](), args.fee, args.slippage, interval=interval)
+        started = time.perf_counter()
+        result = engine.run()
+        elapsed = time.perf_counter() - started
+        print(f"\n🧠 Strategy: {name}")
+        print(result.summary())
+        print(f"⚡ {result.bars:,} bars in {elapsed:.2f}s ({result.bars / elapsed:,.0f} bars/sec)")
+
+
+if __name__ == "__main__":
+    main()
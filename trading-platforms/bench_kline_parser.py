@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: klines response decoding throughput in candles/sec
+Compares the current response.json() + pd.DataFrame + pd.to_numeric path
+with every kline_parser backend on synthetic full pages (1000 candles each).
+"""
+
+import argparse
+import json
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+from binance_api import KLINE_COLUMNS
+from kline_parser import BACKENDS, parse_klines
+
+
+def make_page(start_ms, limit=1000, step_ms=3600 * 1000):
+    """Synthetic klines response body with Binance's number formatting"""
+    rows = []
+    price = random.uniform(20000, 120000)
+    for i in range(limit):
+        open_time = start_ms + i * step_ms
+        high = price * random.uniform(1.0, 1.01)
+        low = price * random.uniform(0.99, 1.0)
+        close = random.uniform(low, high)
+        volume = random.uniform(100, 5000)
+        rows.append([
+            open_time, f"{price:.8f}", f"{high:.8f}", f"{low:.8f}", f"{close:.8f}", f"{volume:.8f}",
+            open_time + step_ms - 1, f"{volume * close:.8f}", random.randint(10000, 300000),
+            f"{volume / 2:.8f}", f"{volume * close / 2:.8f}", "0"
+        ])
+        price = close
+    return json.dumps(rows, separators=(',', ':')).encode()
+
+
+def current_path(raw):
+    """What the crawlers do today: response.json() then 9 pd.to_numeric passes"""
+    df = pd.DataFrame(json.loads(raw), columns=KLINE_COLUMNS)
+    df['open_time'] = pd.to_datetime(df['open_time'], unit='ms')
+    df['close_time'] = pd.to_datetime(df['close_time'], unit='ms')
+    for col in ['open', 'high', 'low', 'close', 'volume', 'quote_asset_volume',
+                'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'number_of_trades']:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df
+
+
+def bench(name, parse, pages, candles, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for raw in pages:
+            parse(raw)
+        best = min(best, time.perf_counter() - start)
+    rate = candles / best
+    print(f"   {name:<28} {best * 1000:9.1f} ms   {rate:14,.0f} candles/sec")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark klines response decoding")
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    random.seed(42)
+    pages = [make_page(i * 1000 * 3600 * 1000) for i in range(args.pages)]
+    candles = args.pages * 1000
+    size_mb = sum(len(raw) for raw in pages) / (1024 * 1024)
+
+    # Every backend must agree with Python's correctly rounded float() before
+    # we time anything (pd.to_numeric itself can be 1 ULP off)
+    rows = json.loads(pages[0])
+    for name in BACKENDS:
+        page = parse_klines(pages[0], backend=name)
+        for index, col in enumerate(KLINE_COLUMNS[:-1]):
+            expected = np.array([float(row[index]) for row in rows]).astype(page[col].dtype)
+            assert np.array_equal(page[col], expected), (name, col)
+
+    # Pages the numpy tokenizer cannot read must fall back to JSON, not raise
+    with_null = b'[[1,null,"2","3","4","5",6,"7",8,"9","10","0"]]'
+    assert BACKENDS['numpy'](with_null) is None
+    assert np.isnan(parse_klines(with_null)['open'][0])
+    malformed = b'[[1,"abc","2","3","4","5",6,"7",8,"9","10","0"]]'
+    assert BACKENDS['numpy'](malformed) is None
+    try:
+        parse_klines(malformed)
+    except ValueError:
+        pass  # parse_json rejects the non-numeric price itself
+    else:
+        raise AssertionError("malformed page parsed")
+
+    print(f"📊 Decoding {candles:,} candles ({args.pages} pages, {size_mb:.1f} MB of JSON)")
+    baseline = bench("response.json + to_numeric", current_path, pages, candles, args.repeat)
+    for name, parse in BACKENDS.items():
+        rate = bench(f"kline_parser[{name}]", lambda raw, name=name: parse_klines(raw, backend=name),
+                     pages, candles, args.repeat)
+        print(f"   {'':<28} {rate / baseline:9.1f}x vs current path")
+
+
+if __name__ == "__main__":
+    main()
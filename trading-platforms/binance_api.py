@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Shared Binance kline constants used by all crawlers
+"""
+
+BASE_URL = "https://api.binance.com"
+KLINES_ENDPOINT = f"{BASE_URL}/api/v3/klines"
+EXCHANGE_INFO_ENDPOINT = f"{BASE_URL}/api/v3/exchangeInfo"
+MAX_LIMIT = 1000  # Max candles per klines request
+
+KLINE_COLUMNS = [
+    'open_time', 'open', 'high', 'low', 'close', 'volume',
+    'close_time', 'quote_asset_volume', 'number_of_trades',
+    'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore'
+]
+
+# Fixed-length intervals only - '1M' has no constant length in milliseconds
+INTERVAL_MS = {
+    '1s': 1000,
+    '1m': 60 * 1000,
+    '3m': 3 * 60 * 1000,
+    '5m': 5 * 60 * 1000,
+    '15m': 15 * 60 * 1000,
+    '30m': 30 * 60 * 1000,
+    '1h': 60 * 60 * 1000,
+    '2h': 2 * 60 * 60 * 1000,
+    '4h': 4 * 60 * 60 * 1000,
+    '6h': 6 * 60 * 60 * 1000,
+    '8h': 8 * 60 * 60 * 1000,
+    '12h': 12 * 60 * 60 * 1000,
+    '1d': 24 * 60 * 60 * 1000,
+    '3d': 3 * 24 * 60 * 60 * 1000,
+    '1w': 7 * 24 * 60 * 60 * 1000,
+}
+
+
+def interval_to_ms(interval):
+    """Length of one candle of `interval` in milliseconds"""
+    try:
+        return INTERVAL_MS[interval]
+    except KeyError:
+        raise ValueError(f"Unsupported interval: {interval!r}") from None
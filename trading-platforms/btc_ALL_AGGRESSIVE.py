@@ -6,22 +6,27 @@ NO MERCY - EVERY SINGLE HOUR SINCE BTCUSDT LAUNCHED!
 """
 
 import pandas as pd
-import requests
 import time
 from datetime import datetime
-import os
 import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+from candle_store import save_candles
+from gap_scanner import backfill_gaps, scan_gaps
+from http_client import HTTP_CLIENT
+from rate_limiter import rate_limited_get
+
 class AggressiveAllCrawler:
-    def __init__(self):
+    def __init__(self, backfill=True, output_file=None, symbol="BTCUSDT", interval="1h"):
         self.base_url = "https://api.binance.com/api/v3/klines"
-        self.symbol = "BTCUSDT"
-        self.interval = "1h"
+        self.symbol = symbol
+        self.interval = interval
         self.chunk_size = 500  # Smaller chunks for reliability
         self.all_data = []
         self.data_lock = threading.Lock()
         self.request_count = 0
+        self.backfill = backfill  # Fetch the gaps left between the parallel chunks
+        self.output_file = output_file  # Optional CSV export
         
     def make_request(self, end_time=None, chunk_id=None):
         """Make a single API request"""
@@ -37,13 +42,12 @@ class AggressiveAllCrawler:
         chunk_info = f"Chunk {chunk_id}" if chunk_id else "Latest"
         
         try:
-            response = requests.get(self.base_url, params=params, timeout=15)
+            response = rate_limited_get(self.base_url, params=params, timeout=15)
             
             self.request_count += 1
             
-            if response.status_code == 429:  # Rate limit
+            if response.status_code in (418, 429):  # Shared limiter pauses until Retry-After
                 print(f"   ⏳ {chunk_info} - Rate limited")
-                time.sleep(1)
                 return None
                 
             if response.status_code != 200:
@@ -87,8 +91,6 @@ class AggressiveAllCrawler:
             # Move backwards
             first_time = data[0][0]  # First record's open time
             current_end_time = first_time - 1
-            
-            time.sleep(0.1)  # Small delay
         
         with self.data_lock:
             self.all_data.extend(chunk_data)
@@ -146,6 +148,7 @@ class AggressiveAllCrawler:
         print(f"\n🎉 AGGRESSIVE CRAWLING COMPLETE!")
         print(f"⏰ Time: {elapsed:.1f} seconds")
         print(f"📡 Total requests: {self.request_count}")
+        HTTP_CLIENT.print_stats()
         print(f"📊 Raw records collected: {len(self.all_data):,}")
         
         if not self.all_data:
@@ -154,8 +157,11 @@ class AggressiveAllCrawler:
         
         return self.process_and_save_data()
     
-    def process_and_save_data(self):
+    def process_and_save_data(self, backfill=None):
         """Process and save the collected data"""
+        if backfill is None:
+            backfill = self.backfill
+        
         print("\n📝 Processing collected data...")
         
         # Convert to DataFrame
@@ -184,17 +190,24 @@ class AggressiveAllCrawler:
         
         print(f"   🧹 Removed {original_count - final_count:,} duplicates")
         
-        # Save to CSV
-        output_file = "btcusdt_AGGRESSIVE_ALL.csv"
-        print(f"💾 Saving to {output_file}...")
+        # Overlaps are gone now, but holes between the chunks are not
+        print("🔍 Scanning for gaps...")
+        report = scan_gaps(df['open_time'], self.interval)
+        print(report.summary())
+        
+        if report.gaps and backfill:
+            klines, _ = backfill_gaps(report.gaps, self.symbol, self.interval)
+            if klines:
+                with self.data_lock:
+                    self.all_data.extend(klines)
+                return self.process_and_save_data(backfill=False)
         
-        df.to_csv(output_file, index=False)
+        # Save to the candle store (CSV only if an export file is given)
+        save_candles(df, self.symbol, self.interval, csv_file=self.output_file)
         
-        file_size = os.path.getsize(output_file) / (1024 * 1024)
         days = (df['open_time'].max() - df['open_time'].min()).days
         
         print(f"\n🏆 AGGRESSIVE SUCCESS!")
-        print(f"📁 File: {output_file} ({file_size:.1f} MB)")
         print(f"📊 Final records: {len(df):,} hours")
         print(f"📅 From: {df['open_time'].min()}")
         print(f"📅 To: {df['open_time'].max()}")
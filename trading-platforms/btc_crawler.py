@@ -8,14 +8,20 @@ import pandas as pd
 import requests
 import time
 from datetime import datetime, timedelta
-import os
+
+from async_crawler import AsyncKlineFetcher
+from candle_store import CandleStore, save_candles
+from crawl_manifest import DEFAULT_MANIFEST, CrawlManifest
+from rate_limiter import rate_limited_get
+from validator import validate_series
 
 class BTCUSDTCrawler:
-    def __init__(self):
+    def __init__(self, max_in_flight=8, symbol="BTCUSDT", interval="1h"):
         self.base_url = "https://api.binance.com"
-        self.symbol = "BTCUSDT"
-        self.interval = "1h"  # Hourly data
+        self.symbol = symbol
+        self.interval = interval  # Hourly data by default
         self.limit = 1000  # Max limit per request
+        self.max_in_flight = max_in_flight  # Concurrent page requests
         
     def get_klines(self, start_time=None, end_time=None):
         """
@@ -35,7 +41,7 @@ class BTCUSDTCrawler:
             params['endTime'] = int(end_time * 1000)
             
         try:
-            response = requests.get(endpoint, params=params)
+            response = rate_limited_get(endpoint, params=params)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
@@ -65,93 +71,98 @@ class BTCUSDTCrawler:
             print(f"Error getting earliest timestamp: {e}")
             return None
     
-    def crawl_all_data(self, output_file="btcusdt_hourly_all.csv"):
+    def crawl_all_data(self, output_file=None, resume=True, manifest_path=DEFAULT_MANIFEST, store=None,
+                       sql_store=None):
         """
-        Crawl ALL historical hourly BTCUSDT data and save to CSV
+        Crawl ALL historical hourly BTCUSDT data into the candle store.
+        Every page is written to its month partition as soon as it arrives and
+        checkpointed in the manifest; with resume=True a re-run only fetches
+        candles newer than the last committed close_time.
+        `output_file` optionally exports the full series as CSV at the end;
+        `sql_store` (a SqlCandleStore) also receives every page as an upsert.
         """
-        print(f"🚀 Starting to crawl ALL BTCUSDT hourly data...")
+        store = store or CandleStore()
+        
+        print(f"🚀 Starting to crawl ALL {self.symbol} {self.interval} data...")
         print(f"📊 Symbol: {self.symbol}")
         print(f"⏰ Interval: {self.interval}")
-        print(f"💾 Output file: {output_file}")
+        print(f"💾 Store: {store.series_dir(self.symbol, self.interval)}")
+        if output_file:
+            print(f"📄 CSV export: {output_file}")
         
-        # Get earliest available timestamp
-        print("\n🔍 Finding earliest available data...")
-        start_timestamp = self.get_earliest_valid_timestamp()
+        manifest = CrawlManifest(manifest_path)
+        checkpoint = manifest.get(self.symbol, self.interval) if resume else None
         
-        if not start_timestamp:
-            print("❌ Could not determine earliest timestamp")
-            return
+        if checkpoint and store.partitions(self.symbol, self.interval):
+            start_ms = checkpoint['last_close_time'] + 1
+            print(f"\n♻️  Resuming after last committed candle: {datetime.fromtimestamp(start_ms / 1000)}")
+        else:
+            # Fresh crawl - partitions are merged, so stored data is simply refreshed
+            manifest.reset(self.symbol, self.interval)
             
-        start_date = datetime.fromtimestamp(start_timestamp)
-        print(f"📅 Earliest data available from: {start_date}")
+            print("\n🔍 Finding earliest available data...")
+            start_timestamp = self.get_earliest_valid_timestamp()
+            
+            if not start_timestamp:
+                print("❌ Could not determine earliest timestamp")
+                return
+            
+            print(f"📅 Earliest data available from: {datetime.fromtimestamp(start_timestamp)}")
+            start_ms = int(start_timestamp * 1000)
         
         # End timestamp is current time
-        end_timestamp = datetime.now().timestamp()
-        end_date = datetime.fromtimestamp(end_timestamp)
-        print(f"📅 Crawling until: {end_date}")
-        
-        all_data = []
-        current_start = start_timestamp
-        batch_count = 0
+        end_ms = int(time.time() * 1000)
+        print(f"📅 Crawling until: {datetime.fromtimestamp(end_ms / 1000)}")
         
-        print(f"\n📥 Starting data collection...")
+        committed = [0]
         
-        while current_start < end_timestamp:
-            batch_count += 1
+        def flush_page(window, page):
+            # Only closed candles are committed; the open one is fetched again next run
+            closed = [kline for kline in page if kline[6] < end_ms]
+            if not closed:
+                return
             
-            # Calculate end time for this batch (1000 hours = ~41.67 days)
-            batch_end = current_start + (self.limit * 3600)  # 3600 seconds per hour
-            if batch_end > end_timestamp:
-                batch_end = end_timestamp
-                
-            print(f"📦 Batch {batch_count}: {datetime.fromtimestamp(current_start).strftime('%Y-%m-%d %H:%M')} to {datetime.fromtimestamp(batch_end).strftime('%Y-%m-%d %H:%M')}")
-            
-            # Get data for this batch
-            data = self.get_klines(start_time=current_start, end_time=batch_end)
+            # Partition rewrites are atomic and idempotent, so a crash between
+            # the write and the commit only means the page is merged again
+            df = self.convert_to_dataframe(closed)
+            store.write(self.symbol, self.interval, df)
+            if sql_store is not None:
+                sql_store.upsert(self.symbol, self.interval, df)
+            manifest.commit(self.symbol, self.interval, closed[-1][6], len(closed),
+                            output_file=store.series_dir(self.symbol, self.interval))
+            committed[0] += len(closed)
+        
+        if start_ms < end_ms:
+            print(f"\n📥 Starting data collection...")
             
-            if data:
-                print(f"   ✅ Received {len(data)} candles")
-                all_data.extend(data)
-                
-                # Update start time to the last candle's close time + 1 hour
-                if data:
-                    last_close_time = data[-1][6] / 1000  # Close time in seconds
-                    current_start = last_close_time + 3600  # Add 1 hour
-                else:
-                    break
-            else:
-                print(f"   ❌ No data received for this batch")
-                break
-                
-            # Rate limiting - be nice to the API
-            time.sleep(0.1)
+            # Pages are fetched concurrently, come back in chronological order
+            # and are flushed one by one - nothing is held until the end
+            fetcher = AsyncKlineFetcher(self.symbol, self.interval, self.limit, max_in_flight=self.max_in_flight)
+            fetcher.fetch_range(start_ms, end_ms, on_page=flush_page, keep_pages=False, stop_on_failure=True)
             
-            # Progress update every 50 batches
-            if batch_count % 50 == 0:
-                total_hours = len(all_data)
-                total_days = total_hours / 24
-                print(f"📈 Progress: {total_hours:,} hours ({total_days:.1f} days) collected so far...")
+            if fetcher.failed_windows:
+                print(f"⚠️  Stopped at a failed page - re-run to resume from the last checkpoint")
         
-        if not all_data:
+        df = store.read(self.symbol, self.interval)
+        if len(df) == 0:
             print("❌ No data collected")
             return
             
         print(f"\n🎉 Data collection complete!")
-        print(f"📊 Total candles collected: {len(all_data):,}")
-        print(f"📅 Time range: {datetime.fromtimestamp(all_data[0][0]/1000)} to {datetime.fromtimestamp(all_data[-1][6]/1000)}")
+        print(f"📊 New candles committed: {committed[0]:,}")
+        print(f"📅 Time range: {df['open_time'].iloc[0]} to {df['close_time'].iloc[-1]}")
         
-        # Convert to DataFrame
-        print(f"\n📝 Converting to DataFrame...")
-        df = self.convert_to_dataframe(all_data)
+        # Store size
+        store_size = store.size_bytes(self.symbol, self.interval) / (1024 * 1024)  # MB
+        print(f"✅ Successfully stored {len(df):,} records")
+        print(f"📁 Store size: {store_size:.1f} MB")
         
-        # Save to CSV
-        print(f"💾 Saving to {output_file}...")
-        df.to_csv(output_file, index=False)
+        # Integrity check of the whole stored series after every crawl
+        print(validate_series(self.symbol, self.interval, store).summary())
         
-        # File size
-        file_size = os.path.getsize(output_file) / (1024 * 1024)  # MB
-        print(f"✅ Successfully saved {len(df):,} records to {output_file}")
-        print(f"📁 File size: {file_size:.1f} MB")
+        if output_file:
+            store.export_csv(self.symbol, self.interval, output_file)
+            print(f"📄 Exported CSV: {output_file}")
         
         # Display sample data
         print(f"\n📋 Sample data (first 5 rows):")
@@ -233,8 +244,7 @@ def main():
         
         if sample_df is not None:
             sample_file = "btcusdt_sample.csv"
-            sample_df.to_csv(sample_file, index=False)
-            print(f"💾 Sample data saved to {sample_file}")
+            save_candles(sample_df, crawler.symbol, crawler.interval, csv_file=sample_file)
             print("\nSample data:")
             print(sample_df[['open_time', 'close']].head(10))
         
@@ -245,9 +255,7 @@ def main():
     
     # Full data crawl
     print("\n🚀 Starting full historical data crawl...")
-    output_file = input("Enter output filename (default: btcusdt_hourly_all.csv): ").strip()
-    if not output_file:
-        output_file = "btcusdt_hourly_all.csv"
+    output_file = input("Also export CSV? Enter filename (blank = candle store only): ").strip() or None
     
     start_time = time.time()
     df = crawler.crawl_all_data(output_file)
@@ -259,7 +267,9 @@ def main():
         print(f"📊 Dataset summary:")
         print(f"   • Records: {len(df):,}")
         print(f"   • Time span: {(df['open_time'].max() - df['open_time'].min()).days} days")
-        print(f"   • File: {output_file}")
+        print(f"   • Store: {CandleStore().series_dir(crawler.symbol, crawler.interval)}")
+        if output_file:
+            print(f"   • CSV: {output_file}")
         print(f"\n🎯 Ready for backtesting! 🚀")
     else:
         print("❌ Crawling failed")
@@ -5,58 +5,48 @@ No mercy, no limits - EVERYTHING from Binance API
 """
 
 import pandas as pd
-import requests
 import time
-from datetime import datetime, timedelta
-import os
+from datetime import datetime
 import concurrent.futures
 from threading import Lock
 
+from async_crawler import AsyncKlineFetcher
+from candle_store import save_candles
+from kline_builder import KlineColumnBuilder
+from page_planner import candle_count, listing_time, plan_pages, split_pages
+from rate_limiter import rate_limited_get
+
 class ExtremeBTCCrawler:
-    def __init__(self):
+    def __init__(self, symbol="BTCUSDT", interval="1h"):
         self.base_url = "https://api.binance.com"
-        self.symbol = "BTCUSDT"
-        self.interval = "1h"
+        self.symbol = symbol
+        self.interval = interval
         self.limit = 1000  # Max per request
+        self.pages_in_flight_per_chunk = 2  # x 4 chunk workers = 8 requests in flight
+        self.chunks = 16  # Runs of whole pages handed to the chunk workers
         self.data_lock = Lock()
         self.all_data = []
         
     def get_server_time(self):
         """Get Binance server time"""
         try:
-            response = requests.get(f"{self.base_url}/api/v3/time")
+            response = rate_limited_get(f"{self.base_url}/api/v3/time")
             return response.json()['serverTime'] / 1000
         except:
             return time.time()
     
     def get_earliest_timestamp(self):
         """Find the absolute earliest BTCUSDT data"""
-        print("🔍 Finding ABSOLUTE earliest BTCUSDT data...")
-        
-        # Try multiple early dates
-        test_dates = [
-            datetime(2017, 8, 17),  # Binance BTCUSDT launch
-            datetime(2017, 7, 14),  # Binance platform launch
-            datetime(2017, 1, 1),   # Early 2017
-            datetime(2016, 1, 1),   # Just in case
-            datetime(2015, 1, 1),   # Even earlier
-        ]
+        print(f"🔍 Finding ABSOLUTE earliest {self.symbol} data...")
         
-        earliest_found = None
-        
-        for test_date in test_dates:
-            test_timestamp = test_date.timestamp()
-            print(f"   Testing: {test_date.strftime('%Y-%m-%d')}...")
-            
-            data = self.get_klines(start_time=test_timestamp, limit=1)
-            if data and len(data) > 0:
-                earliest_found = data[0][0] / 1000
-                earliest_date = datetime.fromtimestamp(earliest_found)
-                print(f"   ✅ Found data from: {earliest_date}")
-                break
-            else:
-                print(f"   ❌ No data from: {test_date}")
+        # startTime=0 returns the very first candle Binance has for the series
+        first_open = listing_time(self.symbol, self.interval)
+        if first_open is None:
+            print(f"   ❌ No data for {self.symbol} {self.interval}")
+            return None
         
+        earliest_found = first_open / 1000
+        print(f"   ✅ Found data from: {datetime.fromtimestamp(earliest_found)}")
         return earliest_found
     
     def get_klines(self, start_time=None, end_time=None, limit=None):
@@ -80,11 +70,9 @@ class ExtremeBTCCrawler:
         max_retries = 5
         for attempt in range(max_retries):
             try:
-                response = requests.get(endpoint, params=params, timeout=30)
-                if response.status_code == 429:  # Rate limit
-                    wait_time = 2 ** attempt
-                    print(f"   ⏳ Rate limited, waiting {wait_time}s...")
-                    time.sleep(wait_time)
+                response = rate_limited_get(endpoint, params=params, timeout=30)
+                if response.status_code in (418, 429):
+                    # The shared limiter now holds every request until Retry-After
                     continue
                     
                 response.raise_for_status()
@@ -101,36 +89,21 @@ class ExtremeBTCCrawler:
         
         return None
     
-    def crawl_chunk(self, start_time, end_time, chunk_id):
-        """Crawl a specific time chunk"""
-        chunk_data = []
-        current_start = start_time
+    def crawl_chunk(self, start_ms, end_ms, chunk_id):
+        """Crawl a run of whole pages with concurrent page requests"""
+        print(f"🔥 Chunk {chunk_id}: {datetime.fromtimestamp(start_ms / 1000)} to {datetime.fromtimestamp(end_ms / 1000)}")
         
-        print(f"🔥 Chunk {chunk_id}: {datetime.fromtimestamp(start_time)} to {datetime.fromtimestamp(end_time)}")
+        fetcher = AsyncKlineFetcher(self.symbol, self.interval, self.limit,
+                                    max_in_flight=self.pages_in_flight_per_chunk)
+        chunk_data = fetcher.fetch_range(start_ms, end_ms, verbose=False)
         
-        while current_start < end_time:
-            # Calculate this batch end time
-            batch_end = min(current_start + (self.limit * 3600), end_time)
-            
-            data = self.get_klines(start_time=current_start, end_time=batch_end)
-            
-            if data and len(data) > 0:
-                chunk_data.extend(data)
-                print(f"   📦 Chunk {chunk_id}: +{len(data)} candles")
-                
-                # Move to next batch
-                last_close_time = data[-1][6] / 1000
-                current_start = last_close_time + 3600
-            else:
-                print(f"   ⚠️  Chunk {chunk_id}: No more data")
-                break
-            
-            # Small delay to avoid hammering API
-            time.sleep(0.05)
+        if fetcher.failed_windows:
+            print(f"   ⚠️  Chunk {chunk_id}: {len(fetcher.failed_windows)} page(s) failed")
+        print(f"   📦 Chunk {chunk_id}: +{len(chunk_data)} candles")
         
         return chunk_data
     
-    def crawl_all_extreme(self, output_file="btcusdt_EXTREME_ALL.csv"):
+    def crawl_all_extreme(self, output_file=None):
         """EXTREME crawl - get absolutely everything with parallel processing"""
         
         print("🚀🚀🚀 EXTREME BTCUSDT CRAWLER - GETTING EVERYTHING! 🚀🚀🚀")
@@ -147,31 +120,25 @@ class ExtremeBTCCrawler:
         start_date = datetime.fromtimestamp(start_timestamp)
         end_date = datetime.fromtimestamp(end_timestamp)
         
-        total_hours = int((end_timestamp - start_timestamp) / 3600)
-        total_days = total_hours / 24
+        start_ms = int(start_timestamp * 1000)
+        end_ms = int(end_timestamp * 1000)
+        expected = candle_count(start_ms, end_ms, self.interval)
         
         print(f"📅 Time Range: {start_date} to {end_date}")
-        print(f"⏰ Total Hours: {total_hours:,}")
-        print(f"📊 Total Days: {total_days:,.1f}")
-        print(f"📈 Expected Records: ~{total_hours:,}")
+        print(f"📊 Total Days: {(end_timestamp - start_timestamp) / 86400:,.1f}")
+        print(f"📈 Expected Records: {expected:,}")
         
-        # Split into chunks for parallel processing
-        chunk_size = 30 * 24 * 3600  # 30 days per chunk
-        chunks = []
+        # Exact page windows from the listing time, split into runs of whole
+        # pages - chunk boundaries never cut a page, so nothing overlaps
+        pages = plan_pages(start_ms, end_ms, self.interval, self.limit)
+        chunks = [(run[0][0], run[-1][1], chunk_id)
+                  for chunk_id, run in enumerate(split_pages(pages, self.chunks), start=1)]
         
-        current_time = start_timestamp
-        chunk_id = 1
-        
-        while current_time < end_timestamp:
-            chunk_end = min(current_time + chunk_size, end_timestamp)
-            chunks.append((current_time, chunk_end, chunk_id))
-            current_time = chunk_end
-            chunk_id += 1
-        
-        print(f"📦 Created {len(chunks)} chunks for parallel processing")
+        print(f"📦 Planned {len(pages):,} full pages in {len(chunks)} chunks for parallel processing")
         print("🔄 Starting parallel data extraction...")
         
-        all_data = []
+        # Chunks are written straight into typed column arrays sized for the whole range
+        builder = KlineColumnBuilder(capacity=expected)
         
         # Process chunks in parallel
         with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
@@ -185,34 +152,28 @@ class ExtremeBTCCrawler:
                 try:
                     chunk_data = future.result()
                     if chunk_data:
-                        all_data.extend(chunk_data)
+                        builder.append_page(chunk_data)
                         print(f"✅ Chunk {chunk_id} completed: {len(chunk_data)} records")
                     else:
                         print(f"⚠️  Chunk {chunk_id} returned no data")
                 except Exception as e:
                     print(f"❌ Chunk {chunk_id} failed: {e}")
         
-        if not all_data:
+        if builder.rows == 0:
             print("❌ No data collected!")
             return None
         
         print(f"\n🎉 EXTREME CRAWL COMPLETE!")
-        print(f"📊 Total records collected: {len(all_data):,}")
+        print(f"📊 Total records collected: {builder.rows:,}")
         
-        # Remove duplicates and sort
-        print("🔧 Removing duplicates and sorting...")
-        df = self.convert_to_dataframe(all_data)
-        df = df.drop_duplicates(subset=['open_time']).sort_values('open_time').reset_index(drop=True)
+        # Chunks finish out of order, but page windows never overlap - no dedupe needed
+        df = builder.to_dataframe(sort=True)
         
-        print(f"📊 Final dataset: {len(df):,} unique records")
+        print(f"📊 Final dataset: {len(df):,} records")
         print(f"📅 Date range: {df['open_time'].min()} to {df['open_time'].max()}")
         
-        # Save to CSV
-        print(f"💾 Saving to {output_file}...")
-        df.to_csv(output_file, index=False)
-        
-        file_size = os.path.getsize(output_file) / (1024 * 1024)
-        print(f"✅ SAVED: {output_file} ({file_size:.1f} MB)")
+        # Save to the candle store (CSV only if an export file is given)
+        save_candles(df, self.symbol, self.interval, csv_file=output_file)
         
         # Stats
         print(f"\n📈 EXTREME STATS:")
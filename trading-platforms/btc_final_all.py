@@ -4,14 +4,17 @@ FINAL: Get ALL BTCUSDT hourly data efficiently
 Based on successful sample test
 """
 
-import pandas as pd
-import requests
 import time
 from datetime import datetime
-import os
 
-def get_all_btcusdt_final():
-    """Get ALL BTCUSDT data efficiently - final version"""
+from async_crawler import AsyncKlineFetcher
+from candle_store import save_candles
+
+def get_all_btcusdt_final(max_in_flight=8, export_csv=False, max_bytes=None):
+    """Get ALL BTCUSDT data efficiently - final version
+    `max_bytes` caps the in-memory column buffer; older candles are spilled
+    to the candle store when it fills up.
+    """
     
     print("🚀 FINAL CRAWLER: Getting ALL BTCUSDT hourly data")
     print("=" * 60)
@@ -24,127 +27,43 @@ def get_all_btcusdt_final():
     print(f"📅 Starting from: {start_date}")
     print(f"📊 Getting 1000 records per batch...")
     
-    all_data = []
-    batch_count = 0
-    current_start_time = start_timestamp
-    
     total_start_time = time.time()
     
-    while True:
-        batch_count += 1
-        
-        params = {
-            'symbol': 'BTCUSDT',
-            'interval': '1h', 
-            'limit': 1000,
-            'startTime': current_start_time
-        }
-        
-        batch_date = datetime.fromtimestamp(current_start_time / 1000)
-        print(f"📦 Batch {batch_count}: {batch_date.strftime('%Y-%m-%d %H:%M')}", end=" ")
-        
-        batch_start_time = time.time()
-        
-        try:
-            response = requests.get("https://api.binance.com/api/v3/klines", params=params, timeout=30)
-            
-            batch_time = time.time() - batch_start_time
-            
-            if response.status_code == 429:  # Rate limit
-                print(f"⏳ Rate limited - waiting 60s...")
-                time.sleep(60)
-                continue
-                
-            if response.status_code != 200:
-                print(f"❌ Error {response.status_code}")
-                break
-            
-            data = response.json()
-            
-            if not data or len(data) == 0:
-                print("✅ No more data - finished!")
-                break
-            
-            all_data.extend(data)
-            total_records = len(all_data)
-            
-            print(f"✅ +{len(data)} records ({batch_time:.2f}s) | Total: {total_records:,}")
-            
-            # Update start time to get next batch
-            last_close_time = data[-1][6]  # Close time of last candle
-            current_start_time = last_close_time + 1  # Next millisecond
-            
-            # Progress update every 10 batches
-            if batch_count % 10 == 0:
-                elapsed = time.time() - total_start_time
-                total_days = total_records / 24
-                print(f"   📊 Progress: {total_records:,} hours ({total_days:.0f} days) in {elapsed:.1f}s")
-            
-            # Small delay to be nice to API
-            time.sleep(0.1)
-            
-        except Exception as e:
-            print(f"❌ Batch error: {e}")
-            time.sleep(5)
-            continue
+    # Plan every page up to now and fetch them concurrently, in order
+    end_timestamp = int(time.time() * 1000)
+    fetcher = AsyncKlineFetcher('BTCUSDT', '1h', 1000, max_in_flight=max_in_flight, decode='columns')
+    builder = fetcher.fetch_columns(start_timestamp, end_timestamp, max_bytes=max_bytes,
+                                    on_spill=lambda part: save_candles(part, 'BTCUSDT', '1h'))
+    batch_count = fetcher.request_count
     
     total_time = time.time() - total_start_time
     
-    if not all_data:
+    if builder.rows == 0:
         print("❌ No data collected!")
         return None
     
     print(f"\n🎉 DATA COLLECTION COMPLETE!")
     print(f"⏰ Total time: {total_time:.1f} seconds")
     print(f"📊 Batches: {batch_count}")
-    print(f"📈 Records: {len(all_data):,}")
+    print(f"📈 Records: {builder.rows + builder.spilled_rows:,}")
+    if builder.spilled_rows:
+        print(f"   💾 {builder.spilled_rows:,} older records were already spilled to the candle store")
     
     # Convert to DataFrame
     print(f"\n📝 Converting to DataFrame...")
     
-    columns = [
-        'open_time', 'open', 'high', 'low', 'close', 'volume',
-        'close_time', 'quote_asset_volume', 'number_of_trades',
-        'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore'
-    ]
-    
-    df = pd.DataFrame(all_data, columns=columns)
-    
-    # Convert timestamps
-    df['open_time'] = pd.to_datetime(df['open_time'], unit='ms')
-    df['close_time'] = pd.to_datetime(df['close_time'], unit='ms')
-    
-    # Convert numeric columns
-    price_cols = ['open', 'high', 'low', 'close', 'volume', 
-                 'quote_asset_volume', 'taker_buy_base_asset_volume', 
-                 'taker_buy_quote_asset_volume', 'number_of_trades']
-    
-    for col in price_cols:
-        df[col] = pd.to_numeric(df[col])
-    
-    # Remove duplicates and sort
-    print(f"🔧 Removing duplicates and sorting...")
-    original_count = len(df)
-    df = df.drop_duplicates(subset=['open_time']).sort_values('open_time').reset_index(drop=True)
-    final_count = len(df)
-    
-    if original_count != final_count:
-        print(f"   🧹 Removed {original_count - final_count} duplicates")
-    
-    # Save to CSV
-    output_file = "btcusdt_COMPLETE_ALL_DATA.csv"
-    print(f"\n💾 Saving to {output_file}...")
-    
-    df.to_csv(output_file, index=False)
+    # Pages were written straight into typed columns - this is a view, not a copy
+    # Page-aligned windows never overlap, so there are no duplicates to drop
+    df = builder.to_dataframe(sort=True)
     
-    file_size = os.path.getsize(output_file) / (1024 * 1024)
+    # Save to the candle store (CSV only on request)
+    output_file = "btcusdt_COMPLETE_ALL_DATA.csv" if export_csv else None
+    save_candles(df, 'BTCUSDT', '1h', csv_file=output_file)
     
     # Final summary
     time_span = (df['open_time'].max() - df['open_time'].min()).days
     
     print(f"\n🏆 COMPLETE SUCCESS!")
-    print(f"📁 File: {output_file}")
-    print(f"💾 Size: {file_size:.1f} MB") 
     print(f"📊 Records: {len(df):,}")
     print(f"📅 From: {df['open_time'].min()}")
     print(f"📅 To: {df['open_time'].max()}")
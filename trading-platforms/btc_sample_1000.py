@@ -4,11 +4,13 @@ STEP 4: Get SAMPLE data - 1000 hours to verify everything works
 """
 
 import pandas as pd
-import requests
 import time
 from datetime import datetime
 
-def get_sample_1000_hours():
+from candle_store import save_candles
+from rate_limiter import rate_limited_get
+
+def get_sample_1000_hours(export_csv=False):
     """Get exactly 1000 hours of recent BTCUSDT data"""
     
     print("📊 GETTING SAMPLE: 1000 hours of BTCUSDT data")
@@ -24,7 +26,7 @@ def get_sample_1000_hours():
     start_time = time.time()
     
     try:
-        response = requests.get("https://api.binance.com/api/v3/klines", params=params, timeout=30)
+        response = rate_limited_get("https://api.binance.com/api/v3/klines", params=params, timeout=30)
         
         request_time = time.time() - start_time
         print(f"⏰ Request completed in {request_time:.2f} seconds")
@@ -69,14 +71,9 @@ def get_sample_1000_hours():
         print(f"   • Price range: ${df['low'].min():,.2f} - ${df['high'].max():,.2f}")
         print(f"   • Latest price: ${df['close'].iloc[-1]:,.2f}")
         
-        # Save to CSV
-        output_file = "btcusdt_sample_1000h.csv"
-        print(f"\n💾 Saving to {output_file}...")
-        df.to_csv(output_file, index=False)
-        
-        import os
-        file_size = os.path.getsize(output_file) / (1024 * 1024)
-        print(f"✅ Saved: {file_size:.1f} MB")
+        # Save to the candle store (CSV only on request)
+        output_file = "btcusdt_sample_1000h.csv" if export_csv else None
+        save_candles(df, 'BTCUSDT', '1h', csv_file=output_file)
         
         # Show first few rows
         print(f"\n📋 First 5 records:")
@@ -3,10 +3,12 @@
 STEP 1: Test basic Binance API connection
 """
 
-import requests
 import time
 from datetime import datetime
 
+from http_client import HTTP_CLIENT
+from rate_limiter import rate_limited_get
+
 def test_api_connection():
     """Test if Binance API is working"""
     print("🔍 STEP 1: Testing Binance API connection...")
@@ -14,7 +16,7 @@ def test_api_connection():
     try:
         # Test server time first
         print("   📡 Testing server time...")
-        response = requests.get("https://api.binance.com/api/v3/time", timeout=10)
+        response = rate_limited_get("https://api.binance.com/api/v3/time", timeout=10)
         print(f"   Status: {response.status_code}")
         
         if response.status_code == 200:
@@ -31,7 +33,7 @@ def test_api_connection():
     try:
         # Test exchange info
         print("   📡 Testing exchange info...")
-        response = requests.get("https://api.binance.com/api/v3/exchangeInfo", timeout=10)
+        response = rate_limited_get("https://api.binance.com/api/v3/exchangeInfo", timeout=10)
         print(f"   Status: {response.status_code}")
         
         if response.status_code == 200:
@@ -47,7 +49,7 @@ def test_api_connection():
     try:
         # Test BTCUSDT ticker
         print("   📡 Testing BTCUSDT ticker...")
-        response = requests.get("https://api.binance.com/api/v3/ticker/price?symbol=BTCUSDT", timeout=10)
+        response = rate_limited_get("https://api.binance.com/api/v3/ticker/price?symbol=BTCUSDT", timeout=10)
         print(f"   Status: {response.status_code}")
         
         if response.status_code == 200:
@@ -78,7 +80,7 @@ def test_single_kline_request():
         print(f"   📡 Requesting 1 hour of BTCUSDT data...")
         start_time = time.time()
         
-        response = requests.get("https://api.binance.com/api/v3/klines", params=params, timeout=10)
+        response = rate_limited_get("https://api.binance.com/api/v3/klines", params=params, timeout=10)
         
         end_time = time.time()
         request_time = end_time - start_time
@@ -122,7 +124,7 @@ def test_batch_request():
         print(f"   📡 Requesting 10 hours of BTCUSDT data...")
         start_time = time.time()
         
-        response = requests.get("https://api.binance.com/api/v3/klines", params=params, timeout=10)
+        response = rate_limited_get("https://api.binance.com/api/v3/klines", params=params, timeout=10)
         
         end_time = time.time()
         request_time = end_time - start_time
@@ -177,4 +179,5 @@ if __name__ == "__main__":
         exit(1)
     
     print("\n🎉 ALL TESTS PASSED!")
-    print("✅ Ready to proceed with full data collection")
\ No newline at end of file
+    print("✅ Ready to proceed with full data collection")
+    HTTP_CLIENT.print_stats()
\ No newline at end of file
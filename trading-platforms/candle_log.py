@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Compact append-only binary candle log
+A .clog file is a magic header followed by self-describing blocks of up to
+`block_rows` candles. Inside a block every column is stored as:
+  - fixed-point integers (value x 10^k, the largest k <= 8 that round-trips
+    exactly; raw float64 bits if none does)
+  - delta-encoded against the previous row, minus the smallest delta
+    (frame of reference), packed at the narrowest byte width that fits
+close_time is stored relative to open_time, so a regular series encodes its
+two time columns as runs of zeros. Blocks are optionally zlib-compressed
+and carry a CRC, so a torn append is detected and cut off on the next open.
+Readers decode whole blocks straight into NumPy arrays and can jump to any
+block by index or by open_time.
+"""
+
+import argparse
+import os
+import struct
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from candle_store import STORE_COLUMNS, STORE_DTYPES, CandleStore, columns_to_dataframe, dataframe_to_columns
+
+FILE_MAGIC = b'CANDLOG1'
+BLOCK_MAGIC = b'CBLK'
+# magic, payload bytes, rows, codec, first open_time, last open_time, crc32 of payload
+BLOCK_HEADER = struct.Struct('<4sIIBqqI')
+# exponent (-1 = raw float64 bits), first value, frame of reference, byte width
+COLUMN_HEADER = struct.Struct('<bqqB')
+
+CODEC_NONE = 0
+CODEC_ZLIB = 1
+CODECS = {'none': CODEC_NONE, 'zlib': CODEC_ZLIB}
+
+DEFAULT_BLOCK_ROWS = 4096
+MAX_EXPONENT = 8  # Binance quotes every price and volume with 8 decimals
+RAW_FLOAT = -1
+EXACT_INT_LIMIT = 2 ** 53  # Fixed-point values must convert to float64 exactly
+WIDTHS = ((1, np.uint8), (2, np.uint16), (4, np.uint32), (8, np.uint64))
+
+
+def fixed_point(values):
+    """(exponent, int64 array) for the largest exponent that round-trips exactly"""
+    if values.dtype.kind in 'iu':
+        return 0, values.astype(np.int64)
+    if not np.all(np.isfinite(values)):
+        return RAW_FLOAT, values.view(np.int64)
+    largest = np.max(np.abs(values)) if len(values) else 0.0
+    for exponent in range(MAX_EXPONENT, -1, -1):
+        scale = 10.0 ** exponent
+        if largest * scale >= EXACT_INT_LIMIT:
+            continue
+        scaled = np.rint(values * scale)
+        if np.array_equal(scaled / scale, values):
+            return exponent, scaled.astype(np.int64)
+    return RAW_FLOAT, values.view(np.int64)
+
+
+def encode_column(values):
+    exponent, ints = fixed_point(values)
+    first = int(ints[0])
+    deltas = np.diff(ints)
+    reference = int(deltas.min()) if len(deltas) else 0
+    # Wraps to uint64 on purpose; decoding adds it back modulo 2^64
+    offsets = (deltas - np.int64(reference)).view(np.uint64) if len(deltas) else deltas.view(np.uint64)
+    largest = int(offsets.max()) if len(offsets) else 0
+    width, dtype = next((width, dtype) for width, dtype in WIDTHS if largest < 1 << (8 * width))
+    return COLUMN_HEADER.pack(exponent, first, reference, width) + offsets.astype(dtype).tobytes()
+
+
+def decode_column(payload, offset, rows, dtype):
+    exponent, first, reference, width = COLUMN_HEADER.unpack_from(payload, offset)
+    offset += COLUMN_HEADER.size
+    unsigned = dict(WIDTHS)[width]
+    offsets = np.frombuffer(payload, dtype=unsigned, count=rows - 1, offset=offset)
+    offset += (rows - 1) * width
+
+    ints = np.empty(rows, dtype=np.int64)
+    ints[0] = first
+    ints[1:] = offsets.astype(np.int64) + np.int64(reference)
+    np.cumsum(ints, out=ints)
+
+    if exponent == RAW_FLOAT:
+        values = ints.view(np.float64)
+    elif exponent == 0 or np.dtype(dtype).kind in 'iu':
+        values = ints.astype(dtype, copy=False)
+    else:
+        values = ints / (10.0 ** exponent)
+    return values, offset
+
+
+def encode_block(columns, codec=CODEC_ZLIB, level=6):
+    rows = len(columns['open_time'])
+    parts = []
+    for name in STORE_COLUMNS:
+        values = np.asarray(columns[name], dtype=STORE_DTYPES[name])
+        if name == 'close_time':
+            values = values - np.asarray(columns['open_time'], dtype=np.int64)
+        parts.append(encode_column(values))
+    payload = b''.join(parts)
+    if codec == CODEC_ZLIB:
+        payload = zlib.compress(payload, level)
+    header = BLOCK_HEADER.pack(BLOCK_MAGIC, len(payload), rows, codec,
+                               int(columns['open_time'][0]), int(columns['open_time'][-1]),
+                               zlib.crc32(payload))
+    return header + payload
+
+
+def decode_block(payload, rows, codec):
+    if codec == CODEC_ZLIB:
+        payload = zlib.decompress(payload)
+    columns = {}
+    offset = 0
+    for name in STORE_COLUMNS:
+        columns[name], offset = decode_column(payload, offset, rows, STORE_DTYPES[name])
+    columns['close_time'] = columns['close_time'] + columns['open_time']
+    return columns
+
+
+class BlockInfo:
+    def __init__(self, offset, size, rows, codec, first_open, last_open):
+        self.offset = offset  # File offset of the payload
+        self.size = size
+        self.rows = rows
+        self.codec = codec
+        self.first_open = first_open
+        self.last_open = last_open
+
+
+class CandleLog:
+    def __init__(self, path, block_rows=DEFAULT_BLOCK_ROWS, codec='zlib', level=6):
+        self.path = path
+        self.block_rows = block_rows
+        self.codec = CODECS[codec]
+        self.level = level
+        self.blocks = []
+        self.valid_bytes = len(FILE_MAGIC)
+        if os.path.exists(path):
+            self._scan()
+
+    def _scan(self):
+        """Index block headers; anything after the last intact block is a torn append"""
+        self.blocks = []
+        with open(self.path, 'rb') as f:
+            if f.read(len(FILE_MAGIC)) != FILE_MAGIC:
+                raise ValueError(f"{self.path} is not a candle log")
+            offset = len(FILE_MAGIC)
+            while True:
+                header = f.read(BLOCK_HEADER.size)
+                if len(header) < BLOCK_HEADER.size:
+                    break
+                magic, size, rows, codec, first_open, last_open, crc = BLOCK_HEADER.unpack(header)
+                if magic != BLOCK_MAGIC:
+                    break
+                payload = f.read(size)
+                if len(payload) < size or zlib.crc32(payload) != crc:
+                    break
+                self.blocks.append(BlockInfo(offset + BLOCK_HEADER.size, size, rows, codec, first_open, last_open))
+                offset += BLOCK_HEADER.size + size
+        self.valid_bytes = offset
+
+    @property
+    def rows(self):
+        return sum(block.rows for block in self.blocks)
+
+    @property
+    def last_open_time(self):
+        return self.blocks[-1].last_open if self.blocks else None
+
+    def append(self, data):
+        """Append candles (DataFrame or column dict) newer than the last logged one"""
+        columns = data if isinstance(data, dict) else dataframe_to_columns(data)
+        open_time = np.asarray(columns['open_time'], dtype=np.int64)
+        if len(open_time) == 0:
+            return 0
+        if np.any(np.diff(open_time) <= 0):
+            raise ValueError("Candles must be sorted by open_time without duplicates")
+        if self.last_open_time is not None and open_time[0] <= self.last_open_time:
+            raise ValueError(f"Log already holds candles up to open_time {self.last_open_time}; "
+                             "the log is append-only")
+
+        mode = 'r+b' if os.path.exists(self.path) else 'wb'
+        with open(self.path, mode) as f:
+            if mode == 'wb':
+                f.write(FILE_MAGIC)
+            f.seek(self.valid_bytes)
+            f.truncate()  # Drop a torn block left by an interrupted append
+            for start in range(0, len(open_time), self.block_rows):
+                block = {name: np.asarray(columns[name])[start:start + self.block_rows] for name in STORE_COLUMNS}
+                data = encode_block(block, self.codec, self.level)
+                f.write(data)
+                _, size, rows, codec, first_open, last_open, _ = BLOCK_HEADER.unpack_from(data)
+                self.blocks.append(BlockInfo(self.valid_bytes + BLOCK_HEADER.size, size, rows, codec,
+                                             first_open, last_open))
+                self.valid_bytes += len(data)
+            f.flush()
+            os.fsync(f.fileno())
+        return len(open_time)
+
+    def read_block(self, index):
+        """Decode block `index` into typed column arrays"""
+        block = self.blocks[index]
+        with open(self.path, 'rb') as f:
+            f.seek(block.offset)
+            return decode_block(f.read(block.size), block.rows, block.codec)
+
+    def read(self, start=None, end=None, as_frame=True):
+        """Candles with start <= open_time < end (ms), decoding only the overlapping blocks"""
+        last_opens = np.array([block.last_open for block in self.blocks], dtype=np.int64)
+        first_opens = np.array([block.first_open for block in self.blocks], dtype=np.int64)
+        lo = int(np.searchsorted(last_opens, start, side='left')) if start is not None else 0
+        hi = int(np.searchsorted(first_opens, end, side='left')) if end is not None else len(self.blocks)
+
+        parts = []
+        with open(self.path, 'rb') as f:
+            for block in self.blocks[lo:hi]:
+                f.seek(block.offset)
+                parts.append(decode_block(f.read(block.size), block.rows, block.codec))
+
+        if parts:
+            columns = {name: np.concatenate([part[name] for part in parts]) for name in STORE_COLUMNS}
+        else:
+            columns = {name: np.empty(0, dtype=STORE_DTYPES[name]) for name in STORE_COLUMNS}
+        if start is not None or end is not None:
+            open_time = columns['open_time']
+            a = np.searchsorted(open_time, start, side='left') if start is not None else 0
+            b = np.searchsorted(open_time, end, side='left') if end is not None else len(open_time)
+            columns = {name: values[a:b] for name, values in columns.items()}
+        return columns_to_dataframe(columns) if as_frame else columns
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write, inspect or read compact candle logs")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    write_parser = subparsers.add_parser("write", help="Append a stored series or CSV to a log")
+    write_parser.add_argument("log_file")
+    write_parser.add_argument("--csv", help="Read candles from this crawler CSV instead of the store")
+    write_parser.add_argument("--symbol", default="BTCUSDT")
+    write_parser.add_argument("--interval", default="1h")
+    write_parser.add_argument("--codec", choices=list(CODECS), default='zlib')
+    write_parser.add_argument("--block-rows", type=int, default=DEFAULT_BLOCK_ROWS)
+
+    info_parser = subparsers.add_parser("info", help="Show blocks and compression of a log")
+    info_parser.add_argument("log_file")
+
+    args = parser.parse_args()
+
+    if args.command == "write":
+        log = CandleLog(args.log_file, block_rows=args.block_rows, codec=args.codec)
+        df = pd.read_csv(args.csv) if args.csv else CandleStore().read(args.symbol, args.interval)
+        columns = dataframe_to_columns(df)
+        if log.last_open_time is not None:
+            keep = columns['open_time'] > log.last_open_time
+            columns = {name: values[keep] for name, values in columns.items()}
+        added = log.append(columns)
+        print(f"📝 Appended {added:,} candles to {args.log_file}")
+
+    log = CandleLog(args.log_file)
+    size = os.path.getsize(args.log_file)
+    print(f"📦 {args.log_file}: {len(log.blocks):,} blocks, {log.rows:,} candles, "
+          f"{size / (1024 * 1024):.2f} MB ({size / max(log.rows, 1):.1f} bytes/candle)")
+
+
+if __name__ == "__main__":
+    main()
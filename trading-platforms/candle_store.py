@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+Partitioned columnar candle store - the default sink for crawler output
+Layout: <root>/<SYMBOL>/<interval>/<YYYY-MM>/<version>/<column>.npy
+Each month partition holds one typed .npy file per column. A rewrite goes
+to a fresh version directory and is published by atomically swapping the
+partition's CURRENT pointer, so readers never see a half-written partition.
+"""
+
+import os
+import shutil
+import time
+import uuid
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows - fall back to an exclusive-create lock file
+    fcntl = None
+
+DEFAULT_STORE = "candle_store"
+LOCK_FILE = ".lock"
+
+# Stored schema - the always-zero 'ignore' column is not stored
+STORE_DTYPES = {
+    'open_time': np.int64,   # ms since epoch
+    'open': np.float64,
+    'high': np.float64,
+    'low': np.float64,
+    'close': np.float64,
+    'volume': np.float64,
+    'close_time': np.int64,  # ms since epoch
+    'quote_asset_volume': np.float64,
+    'number_of_trades': np.int64,
+    'taker_buy_base_asset_volume': np.float64,
+    'taker_buy_quote_asset_volume': np.float64,
+}
+STORE_COLUMNS = list(STORE_DTYPES)
+TIME_COLUMNS = ('open_time', 'close_time')
+
+
+def month_key(open_time_ms):
+    """'YYYY-MM' partition key for each ms timestamp"""
+    months = np.asarray(open_time_ms, dtype='datetime64[ms]').astype('datetime64[M]')
+    return np.datetime_as_string(months, unit='M')
+
+
+def dataframe_to_columns(df):
+    """convert_to_dataframe output (or a re-read CSV) to typed column arrays"""
+    columns = {}
+    for name, dtype in STORE_DTYPES.items():
+        values = df[name]
+        if name in TIME_COLUMNS:
+            if pd.api.types.is_integer_dtype(values):
+                columns[name] = values.to_numpy(dtype=np.int64)
+            else:
+                columns[name] = pd.to_datetime(values).to_numpy(dtype='datetime64[ms]').astype(np.int64)
+        else:
+            columns[name] = pd.to_numeric(values, errors='coerce').to_numpy(dtype=dtype)
+    return columns
+
+
+def timestamp_ms(value):
+    """ms int or float, datetime, Timestamp or date string (naive = UTC) to int64 ms"""
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, (float, np.floating)):
+        # pd.Timestamp would read a bare number as ns (time.time() * 1000 -> 1970)
+        if not np.isfinite(value):
+            raise ValueError(f"Timestamp must be finite ms, got {value!r}")
+        return int(np.floor(value))
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_convert('UTC').tz_localize(None)
+    return int(timestamp.value // 1_000_000)
+
+
+def sibling_root(root, name):
+    """
+    Directory beside a store root (candle_store -> candle_store_<name>) for
+    data that is not a symbol, so listing the store only ever finds symbols
+    """
+    return f"{os.path.normpath(root)}_{name}"
+
+
+def columns_to_dataframe(columns):
+    """Typed column arrays back to the convert_to_dataframe layout"""
+    data = {}
+    for name, values in columns.items():
+        if name in TIME_COLUMNS:
+            data[name] = pd.to_datetime(values, unit='ms')
+        else:
+            data[name] = values
+    return pd.DataFrame(data, copy=False)
+
+
+class CandleStore:
+    def __init__(self, root=DEFAULT_STORE):
+        self.root = root
+
+    def series_dir(self, symbol, interval):
+        return os.path.join(self.root, symbol, interval)
+
+    @contextmanager
+    def lock(self, symbol, interval):
+        """
+        Exclusive per-series write lock, held across the read-merge-write of
+        its partitions and the CURRENT swaps so concurrent writers (threads or
+        processes) cannot drop each other's rows. Readers never take it.
+        """
+        series_dir = self.series_dir(symbol, interval)
+        os.makedirs(series_dir, exist_ok=True)
+        path = os.path.join(series_dir, LOCK_FILE)
+        if fcntl is not None:
+            with open(path, 'a') as f:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            return
+        while True:
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                break
+            except FileExistsError:
+                time.sleep(0.05)
+        try:
+            yield
+        finally:
+            os.close(fd)
+            os.remove(path)
+
+    def partitions(self, symbol, interval):
+        """Sorted month keys that have a published version"""
+        series_dir = self.series_dir(symbol, interval)
+        if not os.path.isdir(series_dir):
+            return []
+        return sorted(
+            name for name in os.listdir(series_dir)
+            if os.path.exists(os.path.join(series_dir, name, 'CURRENT'))
+        )
+
+    def partition_version(self, symbol, interval, month):
+        """Version id currently published for a partition, or None"""
+        pointer = os.path.join(self.series_dir(symbol, interval), month, 'CURRENT')
+        try:
+            with open(pointer) as f:
+                return f.read().strip()
+        except FileNotFoundError:
+            return None
+
+    def partition_path(self, symbol, interval, month):
+        version = self.partition_version(symbol, interval, month)
+        if version is None:
+            return None
+        return os.path.join(self.series_dir(symbol, interval), month, version)
+
+    def read_partition(self, symbol, interval, month, columns=None, mmap_mode=None):
+        """Column arrays of one partition; only the requested columns are opened"""
+        path = self.partition_path(symbol, interval, month)
+        if path is None:
+            return None
+        columns = columns or STORE_COLUMNS
+        return {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode) for name in columns}
+
+    def write_partition(self, symbol, interval, month, columns):
+        """Atomically replace one partition with `columns` (all STORE_COLUMNS)"""
+        partition_dir = os.path.join(self.series_dir(symbol, interval), month)
+        os.makedirs(partition_dir, exist_ok=True)
+
+        version = uuid.uuid4().hex[:12]
+        version_dir = os.path.join(partition_dir, version)
+        os.makedirs(version_dir)
+        for name in STORE_COLUMNS:
+            np.save(os.path.join(version_dir, f"{name}.npy"),
+                    np.ascontiguousarray(columns[name], dtype=STORE_DTYPES[name]))
+
+        old_version = self.partition_version(symbol, interval, month)
+
+        pointer = os.path.join(partition_dir, 'CURRENT')
+        tmp_pointer = f"{pointer}.{version}.tmp"
+        with open(tmp_pointer, 'w') as f:
+            f.write(version)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_pointer, pointer)
+
+        # Old versions may still be memory-mapped by readers on other
+        # platforms; on POSIX removing them is safe
+        if old_version and old_version != version:
+            shutil.rmtree(os.path.join(partition_dir, old_version), ignore_errors=True)
+
+    def write(self, symbol, interval, df):
+        """
+        Merge candles into their month partitions.
+        Incoming rows win over stored rows with the same open_time.
+        Returns the list of partitions that were rewritten.
+        """
+        if len(df) == 0:
+            return []
+
+        incoming = dataframe_to_columns(df)
+        keys = month_key(incoming['open_time'])
+        touched = []
+
+        with self.lock(symbol, interval):
+            for month in np.unique(keys):
+                mask = keys == month
+                new_part = {name: values[mask] for name, values in incoming.items()}
+
+                old_part = self.read_partition(symbol, interval, month)
+                if old_part is not None:
+                    merged = {name: np.concatenate([old_part[name], new_part[name]]) for name in STORE_COLUMNS}
+                else:
+                    merged = new_part
+
+                # Stable sort + keep the last row per open_time = newest data wins
+                open_time = merged['open_time']
+                order = np.argsort(open_time, kind='stable')
+                sorted_times = open_time[order]
+                keep = np.ones(len(order), dtype=bool)
+                keep[:-1] = sorted_times[:-1] != sorted_times[1:]
+                rows = order[keep]
+
+                self.write_partition(symbol, interval, month, {name: merged[name][rows] for name in STORE_COLUMNS})
+                touched.append(month)
+
+        return touched
+
+    def read(self, symbol, interval, columns=None, start=None, end=None):
+        """
+        Read a series as a DataFrame, optionally projected to `columns`
+        and limited to partitions overlapping [start, end] (month keys)
+        """
+        columns = list(columns or STORE_COLUMNS)
+        parts = []
+        for month in self.partitions(symbol, interval):
+            if start is not None and month < start:
+                continue
+            if end is not None and month > end:
+                continue
+            parts.append(self.read_partition(symbol, interval, month, columns))
+
+        if not parts:
+            return columns_to_dataframe({name: np.empty(0, dtype=STORE_DTYPES[name]) for name in columns})
+
+        return columns_to_dataframe({name: np.concatenate([part[name] for part in parts]) for name in columns})
+
+    def load_range(self, symbol, interval, start, end, columns=None, as_frame=True):
+        """
+        Candles with start <= open_time < end, found by binary search on the
+        memory-mapped open_time column of each overlapping month partition.
+        Within one partition the result is a zero-copy view of the mapped
+        files; a range spanning months only copies the rows it returns.
+        Time columns come back as datetime64[ms] (int64 ms with as_frame=False).
+        """
+        columns = list(columns or STORE_COLUMNS)
+        start_ms, end_ms = timestamp_ms(start), timestamp_ms(end)
+        first_month, last_month = month_key([start_ms, max(start_ms, end_ms - 1)])
+
+        parts = []
+        if end_ms > start_ms:
+            for month in self.partitions(symbol, interval):
+                if month < first_month or month > last_month:
+                    continue
+                mapped = self.read_partition(symbol, interval, month, set(columns) | {'open_time'}, mmap_mode='r')
+                lo, hi = np.searchsorted(mapped['open_time'], [start_ms, end_ms], side='left')
+                if hi > lo:
+                    parts.append({name: mapped[name][lo:hi] for name in columns})
+
+        if not parts:
+            result = {name: np.empty(0, dtype=STORE_DTYPES[name]) for name in columns}
+        elif len(parts) == 1:
+            result = parts[0]
+        else:
+            result = {name: np.concatenate([part[name] for part in parts]) for name in columns}
+
+        if not as_frame:
+            return result
+        return pd.DataFrame({
+            name: values.view('datetime64[ms]') if name in TIME_COLUMNS else values
+            for name, values in result.items()
+        }, copy=False)
+
+    def size_bytes(self, symbol, interval):
+        """On-disk size of the published versions of a series"""
+        total = 0
+        for month in self.partitions(symbol, interval):
+            path = self.partition_path(symbol, interval, month)
+            total += sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+        return total
+
+    def export_csv(self, symbol, interval, output_file):
+        """Write a series in the crawlers' original CSV layout"""
+        df = self.read(symbol, interval)
+        df['ignore'] = 0
+        df.to_csv(output_file, index=False)
+        return df
+
+
+def load_range(symbol, interval, start, end, columns=None, as_frame=True, store=None):
+    """Time-range query against the default store (see CandleStore.load_range)"""
+    store = store or CandleStore()
+    return store.load_range(symbol, interval, start, end, columns=columns, as_frame=as_frame)
+
+
+def save_candles(df, symbol="BTCUSDT", interval="1h", csv_file=None, store=None, sql_store=None,
+                 validate=True):
+    """
+    Store crawler output; CSV is only written when `csv_file` is given and
+    the candles are also upserted into `sql_store` (a SqlCandleStore) if set.
+    With validate=True anomalies in the batch are reported before storing.
+    """
+    from validator import validate_dataframe  # validator imports this module
+
+    store = store or CandleStore()
+    if validate:
+        report = validate_dataframe(df, interval)
+        if report.anomalies():
+            print(report.summary())
+    months = store.write(symbol, interval, df)
+    size_mb = store.size_bytes(symbol, interval) / (1024 * 1024)
+    print(f"💾 Stored {len(df):,} candles in {store.series_dir(symbol, interval)} "
+          f"({len(months)} partition(s) updated, {size_mb:.1f} MB total)")
+    if sql_store is not None:
+        sql_store.upsert(symbol, interval, df)
+        print(f"🗄️  Upserted into {sql_store.path}")
+    if csv_file:
+        df.to_csv(csv_file, index=False)
+        print(f"📄 Exported CSV: {csv_file}")
+    return months
+
+
+def main():
+    import argparse
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--root", default=DEFAULT_STORE)
+
+    parser = argparse.ArgumentParser(description="Import crawler CSVs into the candle store, query a time range or export a series as CSV")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = subparsers.add_parser("import", parents=[common], help="Merge one or more crawler CSVs into the store")
+    import_parser.add_argument("csv_files", nargs="+")
+    import_parser.add_argument("--symbol", default="BTCUSDT")
+    import_parser.add_argument("--interval", default="1h")
+
+    export_parser = subparsers.add_parser("export", parents=[common], help="Export a stored series as CSV")
+    export_parser.add_argument("output_file")
+    export_parser.add_argument("--symbol", default="BTCUSDT")
+    export_parser.add_argument("--interval", default="1h")
+
+    range_parser = subparsers.add_parser("range", parents=[common], help="Query a time range (start inclusive, end exclusive)")
+    range_parser.add_argument("start")
+    range_parser.add_argument("end")
+    range_parser.add_argument("--symbol", default="BTCUSDT")
+    range_parser.add_argument("--interval", default="1h")
+    range_parser.add_argument("--columns", nargs="+")
+
+    args = parser.parse_args()
+
+    store = CandleStore(args.root)
+    if args.command == "import":
+        for csv_file in args.csv_files:
+            print(f"📥 Importing {csv_file}...")
+            save_candles(pd.read_csv(csv_file), args.symbol, args.interval, store=store)
+    elif args.command == "range":
+        started = time.perf_counter()
+        df = store.load_range(args.symbol, args.interval, args.start, args.end, columns=args.columns)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        print(df)
+        print(f"⚡ {len(df):,} candles in {elapsed_ms:.2f} ms")
+    else:
+        df = store.export_csv(args.symbol, args.interval, args.output_file)
+        print(f"📄 Exported {len(df):,} candles to {args.output_file}")
+
+
+if __name__ == "__main__":
+    main()
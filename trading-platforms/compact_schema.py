@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Compact in-memory candle schema
+The full convert_to_dataframe layout spends 8 bytes on every field, keeps
+the always-zero 'ignore' column and stores close_time although it is
+always open_time + interval - 1ms. The compact layout keeps:
+  open_time             int64 ms
+  open/high/low/close   float32, or int32 fixed-point ('scaled')
+  volumes               float32
+  number_of_trades      uint32
+and derives close_time/ignore on demand - 44 bytes per candle instead of
+96. load_compact() converts a stored series partition by partition, so the
+float64 copy of a whole series never exists in memory.
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from binance_api import interval_to_ms
+from candle_store import STORE_COLUMNS, CandleStore, columns_to_dataframe, dataframe_to_columns
+
+PRICE_COLUMNS = ['open', 'high', 'low', 'close']
+VOLUME_COLUMNS = ['volume', 'quote_asset_volume', 'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume']
+COMPACT_COLUMNS = ['open_time'] + PRICE_COLUMNS + VOLUME_COLUMNS + ['number_of_trades']
+PRECISIONS = ('float32', 'scaled')
+FULL_BYTES_PER_ROW = 8 * (len(STORE_COLUMNS) + 1)  # Store columns + 'ignore', all 8 bytes wide
+
+INT32_MAX = np.iinfo(np.int32).max
+MAX_PRICE_DECIMALS = 8
+
+
+def price_decimals(prices):
+    """
+    (needed, cap): the fewest decimals that represent every price exactly
+    and the most decimals that still keep the largest price inside int32
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    largest = float(np.max(np.abs(prices))) if len(prices) else 0.0
+    cap = 0
+    while cap < MAX_PRICE_DECIMALS and largest * 10.0 ** (cap + 1) <= INT32_MAX:
+        cap += 1
+    needed = next((exponent for exponent in range(MAX_PRICE_DECIMALS + 1)
+                   if np.array_equal(np.rint(prices * 10.0 ** exponent) / 10.0 ** exponent, prices)),
+                  MAX_PRICE_DECIMALS)
+    return needed, cap
+
+
+def price_exponent(chunks):
+    """int32 fixed-point decimals for price arrays (one series, maybe in chunks)"""
+    decimals = [price_decimals(prices) for prices in chunks]
+    if not decimals:
+        return 0
+    return min(max(needed for needed, _ in decimals), min(cap for _, cap in decimals))
+
+
+class CompactCandles:
+    def __init__(self, columns, interval, precision='float32', price_exponent=None):
+        self.columns = columns  # COMPACT_COLUMNS -> arrays
+        self.interval = interval
+        self.precision = precision
+        self.price_exponent = price_exponent  # Only for 'scaled'
+
+    def __len__(self):
+        return len(self.columns['open_time'])
+
+    @property
+    def nbytes(self):
+        return sum(values.nbytes for values in self.columns.values())
+
+    def __getitem__(self, name):
+        """Column decoded to float64/int64 where needed; close_time and ignore are derived"""
+        if name == 'close_time':
+            return self.columns['open_time'] + (interval_to_ms(self.interval) - 1)
+        if name == 'ignore':
+            return np.zeros(len(self), dtype=np.int64)
+        values = self.columns[name]
+        if name in PRICE_COLUMNS and self.precision == 'scaled':
+            return values / (10.0 ** self.price_exponent)
+        return values
+
+    def to_dataframe(self, full=False):
+        """
+        Compact DataFrame (views, scaled prices decoded to float64), or with
+        full=True the complete convert_to_dataframe layout
+        """
+        if full:
+            df = columns_to_dataframe({name: np.asarray(self[name], dtype=np.float64)
+                                       if name not in ('open_time', 'close_time', 'number_of_trades')
+                                       else np.asarray(self[name], dtype=np.int64)
+                                       for name in STORE_COLUMNS})
+            df['ignore'] = 0
+            return df
+        data = {name: self[name] for name in COMPACT_COLUMNS}
+        data['open_time'] = data['open_time'].view('datetime64[ms]')
+        return pd.DataFrame(data, copy=False)
+
+
+def _empty_compact(rows, precision):
+    price_dtype = np.float32 if precision == 'float32' else np.int32
+    columns = {'open_time': np.empty(rows, dtype=np.int64)}
+    columns.update({name: np.empty(rows, dtype=price_dtype) for name in PRICE_COLUMNS})
+    columns.update({name: np.empty(rows, dtype=np.float32) for name in VOLUME_COLUMNS})
+    columns['number_of_trades'] = np.empty(rows, dtype=np.uint32)
+    return columns
+
+
+def check_range(values, dtype, name, hint=""):
+    """Raise instead of letting a cast to integer `dtype` wrap (or turn NaN into garbage)"""
+    values = np.asarray(values)
+    if len(values) == 0:
+        return values
+    info = np.iinfo(dtype)
+    low, high = values.min(), values.max()
+    if not (np.isfinite(low) and np.isfinite(high)) or low < info.min or high > info.max:
+        raise ValueError(f"{name} spans {low}..{high}, which does not fit {np.dtype(dtype).name}{hint}")
+    return values
+
+
+def _fill(target, offset, source, precision, exponent):
+    end = offset + len(source['open_time'])
+    target['open_time'][offset:end] = source['open_time']
+    for name in PRICE_COLUMNS:
+        if precision == 'scaled':
+            scaled = np.rint(np.asarray(source[name]) * 10.0 ** exponent)
+            target[name][offset:end] = check_range(scaled, np.int32, f"{name} x 1e{exponent}",
+                                                   "; use precision='float32' or a smaller exponent")
+        else:
+            target[name][offset:end] = source[name]
+    for name in VOLUME_COLUMNS:
+        target[name][offset:end] = source[name]
+    target['number_of_trades'][offset:end] = check_range(source['number_of_trades'], np.uint32, 'number_of_trades')
+    return end
+
+
+def to_compact(data, interval, precision='float32', exponent=None):
+    """DataFrame or typed column dict -> CompactCandles"""
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision {precision!r}; choose from {', '.join(PRECISIONS)}")
+    columns = data if isinstance(data, dict) else dataframe_to_columns(data)
+    if precision == 'scaled' and exponent is None:
+        exponent = price_exponent([np.asarray(columns[name]) for name in PRICE_COLUMNS])
+    compact = _empty_compact(len(columns['open_time']), precision)
+    _fill(compact, 0, columns, precision, exponent)
+    return CompactCandles(compact, interval, precision, exponent if precision == 'scaled' else None)
+
+
+def load_compact(symbol, interval, precision='float32', store=None, exponent=None):
+    """
+    Stored series straight into compact arrays, one memory-mapped month
+    partition at a time (peak memory ~ the compact result + one partition)
+    """
+    store = store or CandleStore()
+    months = store.partitions(symbol, interval)
+    rows = sum(len(store.read_partition(symbol, interval, month, ['open_time'], mmap_mode='r')['open_time'])
+               for month in months)
+    if precision == 'scaled' and exponent is None:
+        # Decimals must hold across the whole series - scan the mapped price columns
+        exponent = price_exponent([
+            store.read_partition(symbol, interval, month, [name], mmap_mode='r')[name]
+            for month in months for name in PRICE_COLUMNS
+        ])
+
+    compact = _empty_compact(rows, precision)
+    offset = 0
+    for month in months:
+        offset = _fill(compact, offset, store.read_partition(symbol, interval, month, mmap_mode='r'),
+                       precision, exponent)
+    return CompactCandles(compact, interval, precision, exponent if precision == 'scaled' else None)
+
+
+def compare_schemas(data, interval):
+    """
+    Memory footprint and precision loss of each compact mode against the
+    full float64 layout. Returns a DataFrame with one row per mode.
+    """
+    columns = data if isinstance(data, dict) else dataframe_to_columns(data)
+    rows = len(columns['open_time'])
+    full_bytes = rows * FULL_BYTES_PER_ROW
+    report = [{'schema': 'full', 'bytes': full_bytes, 'bytes_per_row': FULL_BYTES_PER_ROW,
+               'ratio': 1.0, 'max_price_rel_error': 0.0, 'max_volume_rel_error': 0.0, 'exact_prices': 1.0}]
+
+    for precision in PRECISIONS:
+        compact = to_compact(columns, interval, precision)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            price_errors = [np.abs(np.asarray(compact[name], dtype=np.float64) / columns[name] - 1) for name in PRICE_COLUMNS]
+            volume_errors = [np.abs(np.asarray(compact[name], dtype=np.float64) - columns[name])
+                             / np.maximum(np.abs(columns[name]), 1e-12) for name in VOLUME_COLUMNS]
+        exact = np.mean([np.mean(np.asarray(compact[name], dtype=np.float64) == columns[name]) for name in PRICE_COLUMNS])
+        report.append({
+            'schema': precision if precision == 'float32' else f"scaled (1e-{compact.price_exponent})",
+            'bytes': compact.nbytes,
+            'bytes_per_row': compact.nbytes / max(rows, 1),
+            'ratio': compact.nbytes / max(full_bytes, 1),
+            'max_price_rel_error': float(np.nanmax(price_errors)) if rows else 0.0,
+            'max_volume_rel_error': float(np.nanmax(volume_errors)) if rows else 0.0,
+            'exact_prices': float(exact) if rows else 1.0,
+        })
+    return pd.DataFrame(report)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the compact candle schemas against the full layout")
+    parser.add_argument("csv_file", nargs="?", help="Crawler CSV (default: the stored series)")
+    parser.add_argument("--symbol", default="BTCUSDT")
+    parser.add_argument("--interval", default="1h")
+    parser.add_argument("--symbols", type=int, default=300, help="Symbols for the RAM projection")
+    parser.add_argument("--years", type=float, default=5, help="Years of 1m history for the RAM projection")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.csv_file) if args.csv_file else CandleStore().read(args.symbol, args.interval)
+    report = compare_schemas(df, args.interval)
+    print(f"📐 {len(df):,} {args.interval} candles")
+    print(report.to_string(index=False, formatters={
+        'bytes': '{:,.0f}'.format, 'bytes_per_row': '{:.1f}'.format, 'ratio': '{:.2f}'.format,
+        'max_price_rel_error': '{:.2e}'.format, 'max_volume_rel_error': '{:.2e}'.format,
+        'exact_prices': '{:.1%}'.format,
+    }))
+
+    candles = args.symbols * args.years * 365 * 24 * 60
+    print(f"\n💻 {args.symbols} symbols x {args.years:g} years of 1m candles ({candles:,.0f} rows):")
+    for _, row in report.iterrows():
+        print(f"   • {row['schema']:<16} {candles * row['bytes_per_row'] / 1024 ** 3:8.1f} GB")
+
+
+if __name__ == "__main__":
+    main()
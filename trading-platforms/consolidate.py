@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Sorted-merge consolidation of overlapping candle files
+Streams any number of open_time-sorted crawler CSVs through a k-way heap
+merge into one canonical series. Each source is read in chunks and the
+output is written in batches, so memory stays bounded by chunksize x k no
+matter how long the series are. When several sources hold the same candle
+a conflict policy picks the row that survives.
+"""
+
+import argparse
+import heapq
+import os
+
+import numpy as np
+import pandas as pd
+
+from candle_store import STORE_COLUMNS, STORE_DTYPES, CandleStore, columns_to_dataframe, dataframe_to_columns
+
+VOLUME = STORE_COLUMNS.index('volume')
+TRADES = STORE_COLUMNS.index('number_of_trades')
+
+
+def _first(group):
+    return group[0]
+
+
+def _last(group):
+    return group[-1]
+
+
+def _max_volume(group):
+    # A candle captured while still open has less volume than the closed one
+    return max(group, key=lambda item: (item[1][VOLUME], item[1][TRADES], -item[0]))
+
+
+def _strict(group):
+    raise ValueError(f"Sources disagree on the candle at open_time {group[0][1][0]}")
+
+
+# Conflict policies: group of (source_index, row) in source order -> winner
+POLICIES = {
+    'first': _first,            # Earliest listed source wins
+    'last': _last,              # Latest listed source wins
+    'max_volume': _max_volume,  # Most complete candle wins
+    'strict': _strict,          # Any disagreement is an error
+}
+
+
+def rows_equal(a, b, rel_tol=1e-9):
+    """Field-wise equality within rel_tol; missing (NaN) fields match each other"""
+    return bool(np.all(np.isclose(np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64),
+                                  rtol=rel_tol, atol=0.0, equal_nan=True)))
+
+
+def iter_csv_rows(path, source_index, chunksize=100_000):
+    """(open_time, source_index, row) for every row of a sorted crawler CSV"""
+    last = None
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        columns = dataframe_to_columns(chunk)
+        open_time = columns['open_time']
+        if len(open_time) and ((last is not None and open_time[0] < last) or np.any(np.diff(open_time) < 0)):
+            raise ValueError(f"{path} is not sorted by open_time - repair it with gap_scanner.py first")
+        if len(open_time):
+            last = open_time[-1]
+        for row in zip(*(columns[name].tolist() for name in STORE_COLUMNS)):
+            yield row[0], source_index, row
+
+
+class MergeReport:
+    def __init__(self, sources, policy):
+        self.sources = sources
+        self.policy = policy
+        self.rows_in = [0] * len(sources)
+        self.rows_out = 0
+        self.duplicates = 0  # Same candle, same values in more than one row
+        self.conflicts = 0   # Same candle, different values
+        self.wins = [0] * len(sources)  # Conflicts resolved in favour of each source
+
+    def summary(self):
+        lines = [f"🔀 Merged {len(self.sources)} sources with policy '{self.policy}'"]
+        for path, rows, wins in zip(self.sources, self.rows_in, self.wins):
+            lines.append(f"   • {path}: {rows:,} rows, won {wins:,} conflict(s)")
+        lines.append(f"📊 Output rows: {self.rows_out:,}")
+        lines.append(f"🔁 Identical duplicates dropped: {self.duplicates:,}")
+        lines.append(f"⚔️  Conflicting candles resolved: {self.conflicts:,}")
+        return "\n".join(lines)
+
+
+def merge_rows(streams, policy='max_volume', report=None):
+    """
+    k-way merge of (open_time, source_index, row) streams, each sorted by
+    open_time, yielding one row per open_time
+    """
+    resolve = POLICIES[policy]
+    group = []
+
+    def flush():
+        winner = group[0]
+        if len(group) > 1:
+            if all(rows_equal(winner[1], row) for _, row in group[1:]):
+                if report:
+                    report.duplicates += len(group) - 1
+            else:
+                winner = resolve(group)
+                if report:
+                    report.conflicts += 1
+                    report.wins[winner[0]] += 1
+        return winner[1]
+
+    for open_time, source_index, row in heapq.merge(*streams, key=lambda item: (item[0], item[1])):
+        if report:
+            report.rows_in[source_index] += 1
+        if group and group[0][1][0] != open_time:
+            yield flush()
+            group = []
+        group.append((source_index, row))
+    if group:
+        yield flush()
+
+
+def _batch_to_dataframe(batch):
+    fields = list(zip(*batch))
+    return columns_to_dataframe({
+        name: np.asarray(fields[index], dtype=STORE_DTYPES[name])
+        for index, name in enumerate(STORE_COLUMNS)
+    })
+
+
+def consolidate(sources, output_file=None, store=None, symbol="BTCUSDT", interval="1h",
+                policy='max_volume', chunksize=100_000):
+    """
+    Merge sorted crawler CSVs into one series, written in batches of
+    `chunksize` rows to `output_file` (crawler CSV layout) and/or `store`
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown conflict policy {policy!r}; choose from {', '.join(POLICIES)}")
+
+    report = MergeReport(sources, policy)
+    streams = [iter_csv_rows(path, index, chunksize) for index, path in enumerate(sources)]
+
+    tmp_file = f"{output_file}.tmp" if output_file else None
+    header = True
+    batch = []
+
+    def write_batch():
+        nonlocal header
+        df = _batch_to_dataframe(batch)
+        if tmp_file:
+            df['ignore'] = 0
+            df.to_csv(tmp_file, mode='w' if header else 'a', header=header, index=False)
+            header = False
+        if store is not None:
+            store.write(symbol, interval, df)
+        report.rows_out += len(batch)
+        batch.clear()
+
+    published = False
+    try:
+        for row in merge_rows(streams, policy, report):
+            batch.append(row)
+            if len(batch) >= chunksize:
+                write_batch()
+        if batch:
+            write_batch()
+
+        if tmp_file and not header:
+            os.replace(tmp_file, output_file)
+            published = True
+    finally:
+        # A strict-policy conflict or any other failure must not leave a partial file behind
+        if tmp_file and not published and os.path.exists(tmp_file):
+            os.remove(tmp_file)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge overlapping sorted candle CSVs into one canonical series")
+    parser.add_argument("csv_files", nargs="+", help="Sources, in priority order for the 'first'/'last' policies")
+    parser.add_argument("--output", help="Write the merged series to this CSV")
+    parser.add_argument("--store", action="store_true", help="Also merge the result into the candle store")
+    parser.add_argument("--policy", choices=list(POLICIES), default='max_volume')
+    parser.add_argument("--symbol", default="BTCUSDT")
+    parser.add_argument("--interval", default="1h")
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    args = parser.parse_args()
+
+    if not args.output and not args.store:
+        parser.error("nothing to do - pass --output and/or --store")
+
+    store = CandleStore() if args.store else None
+    report = consolidate(args.csv_files, args.output, store, args.symbol, args.interval,
+                         policy=args.policy, chunksize=args.chunksize)
+    print(report.summary())
+    if args.output:
+        print(f"📄 Saved: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+On-disk checkpoint manifest for resumable, incremental crawls
+Records the last committed close_time per symbol/interval so a re-run only
+fetches candles newer than the stored tail
+"""
+
+import json
+import os
+from datetime import datetime
+
+DEFAULT_MANIFEST = "crawl_manifest.json"
+
+
+def series_key(symbol, interval):
+    return f"{symbol}/{interval}"
+
+
+class CrawlManifest:
+    def __init__(self, path=DEFAULT_MANIFEST):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.entries = json.load(f)
+
+    def get(self, symbol, interval):
+        """Checkpoint dict for a series, or None if it was never crawled"""
+        return self.entries.get(series_key(symbol, interval))
+
+    def last_close_time(self, symbol, interval):
+        entry = self.get(symbol, interval)
+        return entry['last_close_time'] if entry else None
+
+    def commit(self, symbol, interval, last_close_time, rows_added, output_file=None, file_size=None):
+        """Advance the checkpoint for a series and persist it atomically"""
+        key = series_key(symbol, interval)
+        entry = self.entries.get(key, {'rows': 0})
+        entry['last_close_time'] = int(last_close_time)
+        entry['rows'] = entry.get('rows', 0) + rows_added
+        entry['updated_at'] = datetime.now().isoformat(timespec='seconds')
+        if output_file is not None:
+            entry['output_file'] = output_file
+        if file_size is not None:
+            entry['file_size'] = file_size
+        self.entries[key] = entry
+        self.save()
+
+    def reset(self, symbol, interval):
+        """Forget a series so the next crawl starts from scratch"""
+        if self.entries.pop(series_key(symbol, interval), None) is not None:
+            self.save()
+
+    def save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
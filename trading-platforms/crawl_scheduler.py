@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Multi-symbol, multi-interval crawl scheduler
+Splits every series of a symbol x interval matrix into page-sized work
+units and runs them on one shared worker pool and weight budget. Units are
+handed out round-robin across the active series, so a 1m history going
+back to 2017 cannot starve a 1d series that needs a handful of pages.
+Each series is flushed to the candle store and checkpointed in order.
+"""
+
+import argparse
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+
+import numpy as np
+
+from async_crawler import AsyncKlineFetcher
+from binance_api import EXCHANGE_INFO_ENDPOINT, MAX_LIMIT
+from candle_store import CandleStore
+from crawl_manifest import DEFAULT_MANIFEST, CrawlManifest
+from http_client import HTTP_CLIENT
+from kline_builder import BYTES_PER_ROW, KlineColumnBuilder
+from page_planner import listing_time
+from rate_limiter import rate_limited_get
+from sql_store import SqlCandleStore
+from validator import validate_series
+
+DEFAULT_INTERVALS = ['1m', '5m', '1h', '1d']
+
+
+def usdt_symbols(limit=None):
+    """Trading USDT spot pairs from exchangeInfo, in exchange order"""
+    response = rate_limited_get(EXCHANGE_INFO_ENDPOINT, timeout=30)
+    response.raise_for_status()
+    symbols = [
+        info['symbol'] for info in response.json()['symbols']
+        if info['quoteAsset'] == 'USDT' and info['status'] == 'TRADING'
+    ]
+    return symbols[:limit] if limit else symbols
+
+
+class SeriesProgress:
+    def __init__(self, symbol, interval, fetcher, windows, end_ms):
+        self.symbol = symbol
+        self.interval = interval
+        self.fetcher = fetcher
+        self.windows = windows
+        self.end_ms = end_ms
+        self.queue = deque(enumerate(windows))  # Units not handed out yet
+        self.ready = {}  # Completed pages waiting for an earlier one
+        self.next_index = 0  # Next page to append in order
+        self.pages_done = 0
+        self.rows = 0  # Closed candles committed
+        self.status = 'queued'
+        self.builder = None
+        self.started = None
+        self.finished = None
+        self.validation = None  # ValidationReport of the stored series once finished
+
+    @property
+    def name(self):
+        return f"{self.symbol} {self.interval}"
+
+    @property
+    def total_pages(self):
+        return len(self.windows)
+
+    @property
+    def complete(self):
+        return self.status in ('done', 'failed', 'up to date', 'no data')
+
+    def line(self):
+        icon = {'done': '✅', 'failed': '❌', 'up to date': '♻️ ', 'no data': '⚪'}.get(self.status, '⏳')
+        line = f"{icon} {self.name:<18} {self.pages_done:>6,}/{self.total_pages:<6,} pages  {self.rows:>12,} candles"
+        if self.started and self.finished:
+            line += f"  {self.finished - self.started:7.1f}s"
+        if self.validation is not None and self.validation.anomalies():
+            line += f"  ⚠️  {self.validation.errors:,} error(s), {self.validation.warnings:,} warning(s)"
+        return line
+
+
+class CrawlScheduler:
+    def __init__(self, symbols, intervals, max_in_flight=8, max_active_series=64, flush_rows=50_000,
+                 limit=MAX_LIMIT, resume=True, store=None, manifest_path=DEFAULT_MANIFEST, sql_store=None):
+        """
+        `max_active_series` bounds how many series are interleaved at once
+        (and so how many flush buffers exist); when one finishes the next
+        queued series joins the rotation. Every series buffers at most
+        `flush_rows` candles before they are written and checkpointed;
+        `sql_store` (a SqlCandleStore) gets the same batches as upserts.
+        """
+        self.symbols = list(symbols)
+        self.intervals = list(intervals)
+        self.max_in_flight = max_in_flight
+        self.max_active_series = max_active_series
+        self.flush_rows = flush_rows
+        self.limit = limit
+        self.resume = resume
+        self.store = store or CandleStore()
+        self.manifest = CrawlManifest(manifest_path)
+        self.sql_store = sql_store
+        self.series = []
+
+    def plan(self, executor):
+        """Resolve the start of every series and split it into page windows"""
+        end_ms = int(time.time() * 1000)
+        pairs = [(symbol, interval) for symbol in self.symbols for interval in self.intervals]
+
+        starts = {}
+        discover = []
+        for symbol, interval in pairs:
+            checkpoint = self.manifest.get(symbol, interval) if self.resume else None
+            if checkpoint and self.store.partitions(symbol, interval):
+                starts[(symbol, interval)] = checkpoint['last_close_time'] + 1
+            else:
+                self.manifest.reset(symbol, interval)
+                discover.append((symbol, interval))
+
+        failed = set()
+        if discover:
+            print(f"🔍 Looking up the first candle of {len(discover):,} new series...")
+
+            def lookup(pair):
+                try:
+                    return listing_time(*pair)
+                except Exception as e:  # Delisted/misspelled symbol or a 429 that outlasted the limiter
+                    print(f"   ❌ {pair[0]} {pair[1]}: first candle lookup failed: {e}")
+                    failed.add(pair)
+                    return None
+
+            for pair, start_ms in zip(discover, executor.map(lookup, discover)):
+                starts[pair] = start_ms
+
+        self.series = []
+        for symbol, interval in pairs:
+            start_ms = starts[(symbol, interval)]
+            fetcher = AsyncKlineFetcher(symbol, interval, self.limit, decode='columns')
+            windows = fetcher.plan_windows(start_ms, end_ms) if start_ms is not None else []
+            series = SeriesProgress(symbol, interval, fetcher, windows, end_ms)
+            if (symbol, interval) in failed:
+                series.status = 'failed'
+            elif start_ms is None:
+                series.status = 'no data'
+            elif not windows:
+                series.status = 'up to date'
+            self.series.append(series)
+        return self.series
+
+    def _units(self):
+        """
+        Round-robin over the active series, admitting queued ones as slots free up.
+        A series keeps its slot (and its flush buffer) until it is finished, not
+        just until its last unit is handed out; while every slot is held by
+        series waiting on in-flight pages this yields None.
+        """
+        waiting = deque(series for series in self.series if not series.complete)
+        active = deque()
+        draining = []  # All units handed out, builder not flushed yet
+        while True:
+            draining = [series for series in draining if not series.complete]
+            while waiting and len(active) + len(draining) < self.max_active_series:
+                series = waiting.popleft()
+                series.status = 'running'
+                series.started = time.time()
+                series.builder = KlineColumnBuilder(
+                    capacity=self.limit, max_bytes=self.flush_rows * BYTES_PER_ROW,
+                    on_spill=lambda df, series=series: self._commit(series, df))
+                active.append(series)
+
+            if not active:
+                if not draining:
+                    return
+                yield None
+                continue
+
+            series = active.popleft()
+            if series.queue and series.status == 'running':
+                index, window = series.queue.popleft()
+                yield series, index, window
+            if series.queue and series.status == 'running':
+                active.append(series)
+            elif not series.complete:
+                draining.append(series)
+
+    def _commit(self, series, df):
+        """Write buffered pages to the store and advance the series checkpoint"""
+        close_times = df['close_time'].to_numpy(dtype='datetime64[ms]').astype(np.int64)
+        closed = close_times < series.end_ms  # The open candle is fetched again next run
+        if not closed.any():
+            return
+        df = df[closed] if not closed.all() else df
+        self.store.write(series.symbol, series.interval, df)
+        if self.sql_store is not None:
+            self.sql_store.upsert(series.symbol, series.interval, df)
+        self.manifest.commit(series.symbol, series.interval, close_times[closed][-1], len(df),
+                             output_file=self.store.series_dir(series.symbol, series.interval))
+        series.rows += len(df)
+
+    def _finish(self, series, status):
+        series.builder.spill()
+        series.builder = None
+        series.status = status
+        series.finished = time.time()
+        if series.rows:
+            series.validation = validate_series(series.symbol, series.interval, self.store)
+        done = sum(1 for s in self.series if s.complete)
+        print(f"[{done:,}/{len(self.series):,}] {series.line()}")
+        if series.validation is not None and not series.validation.ok:
+            print(series.validation.summary())
+
+    def _deliver(self, series, index, page):
+        """Append pages to their series strictly in window order"""
+        if series.status != 'running':
+            return  # Late page of a series that already failed
+        if page is None:
+            window = series.windows[index]
+            print(f"   ❌ {series.name}: page {window[0]}-{window[1]} failed, stopping series at the last checkpoint")
+            series.queue.clear()
+            # Pages before the hole are still committed
+            while series.next_index in series.ready:
+                series.builder.append_page(series.ready.pop(series.next_index))
+                series.next_index += 1
+                series.pages_done += 1
+            series.ready.clear()
+            self._finish(series, 'failed')
+            return
+
+        series.ready[index] = page
+        while series.next_index in series.ready:
+            series.builder.append_page(series.ready.pop(series.next_index))
+            series.next_index += 1
+            series.pages_done += 1
+
+        if series.pages_done == series.total_pages:
+            self._finish(series, 'done')
+
+    def run(self):
+        """Crawl every series; returns the list of SeriesProgress"""
+        start = time.time()
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+            self.plan(executor)
+            total_pages = sum(series.total_pages for series in self.series)
+            print(f"🚀 {len(self.series):,} series, {total_pages:,} pages, "
+                  f"{self.max_in_flight} in flight across up to {self.max_active_series} active series")
+
+            units = self._units()
+            in_flight = {}
+
+            def submit():
+                while len(in_flight) < self.max_in_flight:
+                    unit = next(units, None)
+                    if unit is None:
+                        return  # Nothing to hand out until a page completes (or all done)
+                    series, index, window = unit
+                    in_flight[executor.submit(series.fetcher.fetch_page, *window)] = (series, index)
+
+            submit()
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    series, index = in_flight.pop(future)
+                    self._deliver(series, index, future.result())
+                submit()
+
+        self.report(time.time() - start)
+        return self.series
+
+    def report(self, elapsed=None):
+        print(f"\n📋 Per-series completion:")
+        for series in self.series:
+            print(f"   {series.line()}")
+
+        statuses = {}
+        for series in self.series:
+            statuses[series.status] = statuses.get(series.status, 0) + 1
+        summary = ", ".join(f"{count:,} {status}" for status, count in sorted(statuses.items()))
+        rows = sum(series.rows for series in self.series)
+        print(f"\n📊 {summary}; {rows:,} new candles")
+        if elapsed is not None:
+            print(f"⏰ {elapsed:.1f}s ({rows / max(elapsed, 1e-9):,.0f} candles/sec)")
+        HTTP_CLIENT.print_stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crawl a symbol x interval matrix into the candle store")
+    parser.add_argument("--symbols", nargs="+", help="Symbols to crawl (default: all trading USDT pairs)")
+    parser.add_argument("--top", type=int, help="Only the first N USDT pairs from exchangeInfo")
+    parser.add_argument("--intervals", nargs="+", default=DEFAULT_INTERVALS)
+    parser.add_argument("--max-in-flight", type=int, default=8)
+    parser.add_argument("--max-active-series", type=int, default=64)
+    parser.add_argument("--full", action="store_true", help="Ignore checkpoints and re-download everything")
+    parser.add_argument("--sql", metavar="DB", help="Also upsert every batch into this SQL store")
+    args = parser.parse_args()
+
+    symbols = args.symbols or usdt_symbols(args.top)
+    print(f"🗂️  {len(symbols):,} symbols x {len(args.intervals)} intervals ({', '.join(args.intervals)}) "
+          f"started {datetime.now():%Y-%m-%d %H:%M}")
+
+    sql_store = SqlCandleStore(args.sql) if args.sql else None
+    scheduler = CrawlScheduler(symbols, args.intervals, max_in_flight=args.max_in_flight,
+                               max_active_series=args.max_active_series, resume=not args.full,
+                               sql_store=sql_store)
+    scheduler.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Cached binary load path for the crawler CSVs
+load_csv() parses a CSV once with an explicit dtype schema and keeps one
+.npy file per column in a sidecar directory (.csv_cache/<name>/). Later
+loads memory-map those files, so a notebook start costs a few file opens
+instead of a full pd.read_csv with datetime parsing. The sidecar is keyed
+by the CSV's size, mtime and content hash and is rebuilt when it changes.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from candle_store import STORE_DTYPES, TIME_COLUMNS, dataframe_to_columns
+
+CACHE_DIR = ".csv_cache"
+META_FILE = "meta.json"
+CACHE_VERSION = 1  # Bump when the sidecar layout or schema changes
+
+# Explicit parse schema - times stay strings here and are converted to
+# int64 ms in one vectorized pass by dataframe_to_columns
+CSV_DTYPES = {
+    name: (str if name in TIME_COLUMNS else dtype)
+    for name, dtype in STORE_DTYPES.items()
+}
+CSV_DTYPES['ignore'] = np.int64
+
+
+def file_hash(path, chunk_size=1 << 20):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_dir_for(path):
+    directory, name = os.path.split(os.path.abspath(path))
+    return os.path.join(directory, CACHE_DIR, name)
+
+
+def _read_meta(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, META_FILE)) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _write_meta(cache_dir, meta):
+    tmp_path = os.path.join(cache_dir, f"{META_FILE}.tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, os.path.join(cache_dir, META_FILE))
+
+
+def cache_is_valid(path, cache_dir=None):
+    """
+    Size + mtime match -> valid without reading the CSV. A changed mtime
+    with the same size falls back to the content hash (e.g. after a
+    checkout touched the file) and refreshes the recorded mtime.
+    """
+    cache_dir = cache_dir or cache_dir_for(path)
+    meta = _read_meta(cache_dir)
+    if meta is None or meta.get('version') != CACHE_VERSION:
+        return False
+    stat = os.stat(path)
+    if stat.st_size != meta['size']:
+        return False
+    if stat.st_mtime_ns == meta['mtime_ns']:
+        return True
+    if file_hash(path) != meta['hash']:
+        return False
+    meta['mtime_ns'] = stat.st_mtime_ns
+    _write_meta(cache_dir, meta)
+    return True
+
+
+def build_cache(path, cache_dir=None):
+    """Parse the CSV once and write the column sidecar atomically"""
+    cache_dir = cache_dir or cache_dir_for(path)
+    stat = os.stat(path)
+    header = pd.read_csv(path, nrows=0).columns
+    df = pd.read_csv(path, dtype={name: dtype for name, dtype in CSV_DTYPES.items() if name in header})
+    columns = dataframe_to_columns(df)
+    if 'ignore' in df.columns:
+        columns['ignore'] = df['ignore'].to_numpy(dtype=np.int64)
+
+    tmp_dir = f"{cache_dir}.{uuid.uuid4().hex[:8]}.tmp"
+    os.makedirs(tmp_dir)
+    for name, values in columns.items():
+        np.save(os.path.join(tmp_dir, f"{name}.npy"), values)
+    _write_meta(tmp_dir, {
+        'version': CACHE_VERSION,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'hash': file_hash(path),
+        'columns': list(columns),
+        'rows': len(df),
+    })
+
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    os.replace(tmp_dir, cache_dir)
+    return cache_dir
+
+
+def csv_fingerprint(path):
+    """Content hash of a CSV, served from its (refreshed if stale) sidecar"""
+    cache_dir = cache_dir_for(path)
+    if not cache_is_valid(path, cache_dir):
+        build_cache(path, cache_dir)
+    return _read_meta(cache_dir)['hash']
+
+
+def load_csv(path, columns=None, mmap=True):
+    """
+    Crawler CSV as a DataFrame with datetime64[ms] times and typed numbers
+    (the convert_to_dataframe layout), served from the binary sidecar
+    """
+    cache_dir = cache_dir_for(path)
+    if not cache_is_valid(path, cache_dir):
+        build_cache(path, cache_dir)
+
+    meta = _read_meta(cache_dir)
+    names = [name for name in meta['columns'] if columns is None or name in columns]
+    data = {}
+    for name in names:
+        values = np.load(os.path.join(cache_dir, f"{name}.npy"), mmap_mode='r' if mmap else None)
+        data[name] = values.view('datetime64[ms]') if name in TIME_COLUMNS else values
+    return pd.DataFrame(data, copy=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or refresh the binary caches of crawler CSVs")
+    parser.add_argument("csv_files", nargs="+")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild even if the cache is valid")
+    args = parser.parse_args()
+
+    for csv_file in args.csv_files:
+        if args.rebuild:
+            build_cache(csv_file)
+
+        started = time.perf_counter()
+        pd.read_csv(csv_file, parse_dates=['open_time', 'close_time'])
+        csv_ms = (time.perf_counter() - started) * 1000
+
+        load_csv(csv_file)  # Builds the sidecar if needed
+        started = time.perf_counter()
+        df = load_csv(csv_file)
+        cached_ms = (time.perf_counter() - started) * 1000
+
+        print(f"⚡ {csv_file}: {len(df):,} rows - read_csv {csv_ms:.1f} ms, cached {cached_ms:.2f} ms "
+              f"({csv_ms / max(cached_ms, 1e-6):.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
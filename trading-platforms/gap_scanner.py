@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Gap detection and targeted backfill for stored candle series
+Scans the open_time column in one vectorized pass, lists the missing
+interval ranges and fetches exactly those ranges in parallel
+"""
+
+import argparse
+import asyncio
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from async_crawler import AsyncKlineFetcher
+from binance_api import interval_to_ms
+from page_planner import align_down
+
+
+def to_epoch_ms(values):
+    """open_time column (datetime strings, datetimes or ms ints) to int64 ms"""
+    values = pd.Series(values)
+    if pd.api.types.is_integer_dtype(values):
+        return values.to_numpy(dtype=np.int64)
+    return pd.to_datetime(values).to_numpy(dtype='datetime64[ms]').astype(np.int64)
+
+
+class GapReport:
+    def __init__(self, interval, step, first, last, rows, duplicates, out_of_order, misaligned, gaps):
+        self.interval = interval
+        self.step = step
+        self.first = first
+        self.last = last
+        self.rows = rows
+        self.duplicates = duplicates
+        self.out_of_order = out_of_order
+        self.misaligned = misaligned
+        self.gaps = gaps  # [(first_missing_open_ms, last_missing_open_ms), ...]
+
+    @property
+    def missing_candles(self):
+        return sum((end - start) // self.step + 1 for start, end in self.gaps)
+
+    def summary(self):
+        lines = [
+            f"📊 Rows: {self.rows:,} ({self.interval})",
+            f"📅 From: {datetime.fromtimestamp(self.first / 1000)} to {datetime.fromtimestamp(self.last / 1000)}",
+            f"🔁 Duplicate open_times: {self.duplicates:,}",
+            f"↩️  Out-of-order rows: {self.out_of_order:,}",
+            f"📐 Misaligned open_times: {self.misaligned:,}",
+            f"🕳️  Gaps: {len(self.gaps):,} ({self.missing_candles:,} missing candles)",
+        ]
+        for start, end in self.gaps[:20]:
+            count = (end - start) // self.step + 1
+            lines.append(f"   • {datetime.fromtimestamp(start / 1000)} → {datetime.fromtimestamp(end / 1000)} ({count:,} candles)")
+        if len(self.gaps) > 20:
+            lines.append(f"   ... and {len(self.gaps) - 20:,} more")
+        return "\n".join(lines)
+
+
+def scan_gaps(open_times, interval):
+    """Vectorized scan of an open_time column for holes, overlaps and disorder"""
+    step = interval_to_ms(interval)
+    times = to_epoch_ms(open_times)
+
+    if len(times) == 0:
+        return GapReport(interval, step, 0, 0, 0, 0, 0, 0, [])
+
+    out_of_order = int(np.count_nonzero(np.diff(times) < 0))
+    unique = np.unique(times)  # Sorted
+    duplicates = len(times) - len(unique)
+    misaligned = int(np.count_nonzero(unique != align_down(unique, interval)))
+
+    deltas = np.diff(unique)
+    holes = np.flatnonzero(deltas > step)
+    gap_starts = unique[holes] + step
+    gap_ends = unique[holes + 1] - step
+    gaps = list(zip(gap_starts.tolist(), gap_ends.tolist()))
+
+    return GapReport(interval, step, int(unique[0]), int(unique[-1]), len(times),
+                     duplicates, out_of_order, misaligned, gaps)
+
+
+def backfill_gaps(gaps, symbol="BTCUSDT", interval="1h", max_in_flight=8):
+    """
+    Fetch exactly the missing ranges, all gaps in parallel.
+    Returns (klines, empty_windows); empty windows are holes on the exchange
+    side (maintenance, delisting) that no re-crawl can fill.
+    """
+    fetcher = AsyncKlineFetcher(symbol, interval, max_in_flight=max_in_flight)
+    windows = []
+    for start, end in gaps:
+        windows.extend(fetcher.plan_windows(start, end))
+
+    if not windows:
+        return [], []
+
+    print(f"🩹 Backfilling {len(gaps):,} gaps with {len(windows):,} requests...")
+
+    empty_windows = []
+
+    def note_empty(window, page):
+        if not page:
+            empty_windows.append(window)
+
+    pages, failed = asyncio.run(fetcher.fetch_pages(windows, on_page=note_empty))
+    if failed:
+        print(f"⚠️  {len(failed)} backfill request(s) failed: {failed}")
+
+    klines = [kline for page in pages for kline in page]
+    return klines, empty_windows
+
+
+def repair_csv(path, symbol="BTCUSDT", interval="1h", max_in_flight=8):
+    """Scan a crawler CSV, backfill its gaps and rewrite it sorted and de-duplicated"""
+    df = pd.read_csv(path)
+    report = scan_gaps(df['open_time'], interval)
+    print(report.summary())
+
+    if not report.gaps and not report.duplicates and not report.out_of_order:
+        print("✅ Series is complete - nothing to repair")
+        return df
+
+    klines, empty_windows = backfill_gaps(report.gaps, symbol, interval, max_in_flight)
+    print(f"   📥 Fetched {len(klines):,} missing candles")
+    if empty_windows:
+        print(f"   ℹ️  {len(empty_windows):,} window(s) are empty on the exchange too")
+
+    if klines:
+        from btc_crawler import BTCUSDTCrawler
+        patch = BTCUSDTCrawler().convert_to_dataframe(klines)
+        patch['open_time'] = patch['open_time'].astype(str)
+        patch['close_time'] = patch['close_time'].astype(str)
+        df = pd.concat([df, patch[df.columns]], ignore_index=True)
+
+    # Stable sort keeps the stored row first when a backfilled candle duplicates it
+    open_ms = to_epoch_ms(df['open_time'])
+    order = np.argsort(open_ms, kind='stable')
+    sorted_ms = open_ms[order]
+    keep = np.ones(len(order), dtype=bool)
+    keep[1:] = sorted_ms[1:] != sorted_ms[:-1]
+    df = df.iloc[order[keep]].reset_index(drop=True)
+
+    tmp_path = f"{path}.tmp"
+    df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+    after = scan_gaps(df['open_time'], interval)
+    print(f"✅ Repaired {path}: {len(df):,} rows, {len(after.gaps):,} gaps left")
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report (and optionally backfill) gaps in a candle CSV")
+    parser.add_argument("csv_file")
+    parser.add_argument("--symbol", default="BTCUSDT")
+    parser.add_argument("--interval", default="1h")
+    parser.add_argument("--backfill", action="store_true", help="Fetch the missing ranges and rewrite the file")
+    parser.add_argument("--max-in-flight", type=int, default=8)
+    args = parser.parse_args()
+
+    if args.backfill:
+        repair_csv(args.csv_file, args.symbol, args.interval, args.max_in_flight)
+    else:
+        df = pd.read_csv(args.csv_file, usecols=['open_time'])
+        print(scan_gaps(df['open_time'], args.interval).summary())
+
+
+if __name__ == "__main__":
+    main()
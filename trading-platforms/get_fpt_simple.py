@@ -3,10 +3,11 @@
 Simple script to get FPT stock price from public APIs
 """
 
-import requests
 import json
 from datetime import datetime
 
+from http_client import HTTP_CLIENT, http_get
+
 def get_fpt_price_yahoo():
     """Get FPT price from Yahoo Finance"""
     try:
@@ -17,7 +18,7 @@ def get_fpt_price_yahoo():
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
         
-        response = requests.get(url, headers=headers, timeout=10)
+        response = http_get(url, headers=headers, timeout=10)
         
         if response.status_code == 200:
             data = response.json()
@@ -65,7 +66,7 @@ def get_fpt_price_vietstock():
             'code': 'FPT'
         }
         
-        response = requests.get(url, headers=headers, params=params, timeout=10)
+        response = http_get(url, headers=headers, params=params, timeout=10)
         
         if response.status_code == 200:
             try:
@@ -100,4 +101,7 @@ if __name__ == "__main__":
         print("Source: Yahoo Finance")
     else:
         print("\n❌ Could not retrieve FPT stock price from available sources")
-        print("This might be due to market hours or API limitations")
\ No newline at end of file
+        print("This might be due to market hours or API limitations")
+
+    print()
+    HTTP_CLIENT.print_stats()
\ No newline at end of file
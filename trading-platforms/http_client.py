@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Pooled HTTP client shared by all crawlers and price fetchers
+One requests.Session with keep-alive connection pools, gzip negotiation,
+default timeouts and a retry policy per host. Connection reuse stats are
+exposed so we can check that handshakes are actually being saved.
+"""
+
+import threading
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_TIMEOUT = 30
+POOL_MAXSIZE = 32  # Keep-alive connections per host - covers every crawler thread
+
+
+def _retry(total=3, backoff_factor=0.5, status_forcelist=(500, 502, 503, 504)):
+    # 418/429 are left to the rate limiter, which honours Retry-After for
+    # every caller at once instead of retrying one request in isolation
+    return Retry(
+        total=total,
+        connect=total,
+        read=total,
+        status=total,
+        backoff_factor=backoff_factor,
+        status_forcelist=status_forcelist,
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        respect_retry_after_header=False,
+        raise_on_status=False,
+    )
+
+
+# Retry policy per host; anything else uses the default
+HOST_RETRIES = {
+    'api.binance.com': _retry(total=3, backoff_factor=0.25),
+    'query1.finance.yahoo.com': _retry(total=2, backoff_factor=1.0, status_forcelist=(429, 500, 502, 503, 504)),
+    'finance.vietstock.vn': _retry(total=2, backoff_factor=1.0),
+}
+
+
+class HttpClient:
+    def __init__(self, default_timeout=DEFAULT_TIMEOUT, pool_maxsize=POOL_MAXSIZE, host_retries=None):
+        self.default_timeout = default_timeout
+        self.session = requests.Session()
+        self.session.headers.update({
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive',
+        })
+
+        self.session.mount('https://', HTTPAdapter(pool_maxsize=pool_maxsize, max_retries=_retry()))
+        self.session.mount('http://', HTTPAdapter(pool_maxsize=pool_maxsize, max_retries=_retry()))
+        for host, retry in (host_retries or HOST_RETRIES).items():
+            self.session.mount(f"https://{host}", HTTPAdapter(pool_maxsize=pool_maxsize, max_retries=retry))
+
+        self.lock = threading.Lock()
+        self.request_counts = {}
+        self.compressed_counts = {}
+
+    def get(self, url, params=None, timeout=None, **kwargs):
+        """Session GET with the client's default timeout"""
+        response = self.session.get(url, params=params, timeout=timeout or self.default_timeout, **kwargs)
+
+        host = urlparse(url).hostname
+        with self.lock:
+            self.request_counts[host] = self.request_counts.get(host, 0) + 1
+            if response.headers.get('Content-Encoding') in ('gzip', 'deflate'):
+                self.compressed_counts[host] = self.compressed_counts.get(host, 0) + 1
+        return response
+
+    def stats(self):
+        """
+        Per-host connection reuse: requests sent, TCP+TLS connections opened,
+        and how many requests rode on an already-open connection
+        """
+        opened = {}
+        for adapter in set(self.session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is not None:
+                    opened[pool.host] = opened.get(pool.host, 0) + pool.num_connections
+
+        stats = {}
+        with self.lock:
+            for host, count in self.request_counts.items():
+                connections = opened.get(host, 0)
+                stats[host] = {
+                    'requests': count,
+                    'connections_opened': connections,
+                    'reused': max(0, count - connections),
+                    'reuse_ratio': max(0, count - connections) / count if count else 0.0,
+                    'compressed': self.compressed_counts.get(host, 0),
+                }
+        return stats
+
+    def print_stats(self):
+        print("🔌 HTTP connection reuse:")
+        for host, host_stats in sorted(self.stats().items()):
+            print(f"   • {host}: {host_stats['requests']:,} requests over "
+                  f"{host_stats['connections_opened']:,} connections "
+                  f"({host_stats['reuse_ratio']:.0%} reused, {host_stats['compressed']:,} gzip)")
+
+    def close(self):
+        self.session.close()
+
+
+# One client per process so every crawler shares the same keep-alive pools
+HTTP_CLIENT = HttpClient()
+
+
+def http_get(url, params=None, **kwargs):
+    """Drop-in replacement for requests.get backed by the shared pools"""
+    return HTTP_CLIENT.get(url, params=params, **kwargs)
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Content-addressed indicator cache
+Indicator outputs are keyed by (dataset hash, indicator name, parameters).
+For a stored series the dataset hash covers the published CURRENT version
+of every month partition it reads, so an incremental crawl or backfill
+that rewrites a partition changes the key and the stale entry is simply
+never hit again (its disk file is replaced on the next store). For a
+crawler CSV the hash is the content hash kept by its csv_cache sidecar.
+
+Two tiers: an in-memory LRU bounded by entries and bytes, then one .npy
+file per entry under <store>_indicators/ beside the store, memory-mapped
+on load.
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import time
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+
+from candle_store import CandleStore, sibling_root
+from indicators import INDICATORS, compute
+
+INDICATOR_NAME = "indicators"  # <store>_indicators beside the candle store
+DEFAULT_MAX_ENTRIES = 128
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def _digest(*parts):
+    return hashlib.blake2b(json.dumps(parts, sort_keys=True).encode(), digest_size=12).hexdigest()
+
+
+def series_fingerprint(store, symbol, interval, start=None, end=None):
+    """Hash of the (month, version) pairs a series read would touch"""
+    months = [month for month in store.partitions(symbol, interval)
+              if (start is None or month >= start) and (end is None or month <= end)]
+    return _digest(symbol, interval, [(month, store.partition_version(symbol, interval, month)) for month in months])
+
+
+class IndicatorCache:
+    def __init__(self, store=None, cache_dir=None, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        self.store = store or CandleStore()
+        self.cache_dir = cache_dir or sibling_root(self.store.root, INDICATOR_NAME)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.memory = OrderedDict()  # key -> value, least recently used first
+        self.memory_bytes = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # --- Public API --------------------------------------------------------
+
+    def get(self, symbol, interval, name, start=None, end=None, **params):
+        """
+        Indicator `name` over a stored series (optionally the months
+        start..end, inclusive 'YYYY-MM' keys), computed at most once per
+        partition version
+        """
+        dataset = series_fingerprint(self.store, symbol, interval, start, end)
+        tag = f"{symbol}_{interval}_{start or 'first'}_{end or 'last'}"
+        return self._get(dataset, tag, name, params,
+                         lambda: self._series_columns(symbol, interval, name, start, end))
+
+    def get_csv(self, path, name, **params):
+        """Indicator `name` over a crawler CSV, keyed by the CSV's content hash"""
+        from csv_cache import csv_fingerprint, load_csv
+        tag = f"{os.path.basename(path).replace('.', '_')}_{_digest(os.path.abspath(path))[:8]}"
+        return self._get(csv_fingerprint(path), tag, name, params,
+                         lambda: self._frame_columns(load_csv(path, columns=INDICATORS[name][2])))
+
+    def stats(self):
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'memory_entries': len(self.memory),
+            'memory_bytes': self.memory_bytes,
+        }
+
+    def summary(self):
+        stats = self.stats()
+        return (f"🗃️  Indicator cache: {stats['memory_hits']:,} memory hit(s), {stats['disk_hits']:,} disk hit(s), "
+                f"{stats['misses']:,} miss(es) ({stats['hit_rate']:.1%} hit rate), "
+                f"{stats['memory_entries']} entries / {stats['memory_bytes'] / 1024 ** 2:.1f} MB in memory, "
+                f"{stats['evictions']:,} eviction(s)")
+
+    def clear_memory(self):
+        self.memory.clear()
+        self.memory_bytes = 0
+
+    # --- Tiers ---------------------------------------------------------------
+
+    def _get(self, dataset, tag, name, params, load_columns):
+        if name not in INDICATORS:
+            raise ValueError(f"Unknown indicator {name!r}; choose from {', '.join(INDICATORS)}")
+        entry = _digest(name, params)
+        key = f"{tag}__{entry}__{dataset}"
+
+        value = self.memory.get(key)
+        if value is not None:
+            self.memory.move_to_end(key)
+            self.memory_hits += 1
+            return value
+
+        value = self._load(key)
+        if value is not None:
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+            value = compute(name, load_columns(), **params)
+            self._save(key, f"{tag}__{entry}__", value)
+            value = self._load(key)  # Serve the read-only mapped copy like a disk hit
+        self._remember(key, value)
+        return value
+
+    def _remember(self, key, value):
+        self.memory[key] = value
+        self.memory_bytes += _nbytes(value)
+        while self.memory and (len(self.memory) > self.max_entries or self.memory_bytes > self.max_bytes):
+            _, evicted = self.memory.popitem(last=False)
+            self.memory_bytes -= _nbytes(evicted)
+            self.evictions += 1
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.npy")
+
+    def _load(self, key):
+        try:
+            data = np.load(self._path(key), mmap_mode='r')
+        except FileNotFoundError:
+            return None
+        return tuple(data) if data.ndim == 2 else data  # Multi-output indicators are stored stacked
+
+    def _save(self, key, prefix, value):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        data = np.stack(value) if isinstance(value, tuple) else value
+        tmp_path = os.path.join(self.cache_dir, f".{key}.{uuid.uuid4().hex[:8]}.tmp.npy")
+        np.save(tmp_path, data)
+        os.replace(tmp_path, self._path(key))
+        # Same series range + indicator under an older dataset hash can never be hit again
+        for stale in glob.glob(os.path.join(glob.escape(self.cache_dir), f"{glob.escape(prefix)}*.npy")):
+            if stale != self._path(key):
+                os.remove(stale)
+
+    # --- Inputs ----------------------------------------------------------------
+
+    def _series_columns(self, symbol, interval, name, start, end):
+        df = self.store.read(symbol, interval, columns=list(INDICATORS[name][2]), start=start, end=end)
+        return self._frame_columns(df)
+
+    @staticmethod
+    def _frame_columns(df):
+        columns = {name: df[name].to_numpy() for name in df.columns}
+        if 'open_time' in columns:
+            columns['open_time'] = df['open_time'].to_numpy(dtype='datetime64[ms]').astype(np.int64)
+        return columns
+
+
+def _nbytes(value):
+    return sum(series.nbytes for series in value) if isinstance(value, tuple) else value.nbytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Repeated indicator lookups through the cache")
+    parser.add_argument("csv_file", nargs="?", help="Crawler CSV (default: the stored series)")
+    parser.add_argument("--symbol", default="BTCUSDT")
+    parser.add_argument("--interval", default="1h")
+    parser.add_argument("--indicator", choices=sorted(INDICATORS), default='ema')
+    parser.add_argument("--length", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+
+    params = {} if args.indicator in ('macd', 'vwap') else {'length': args.length}
+    cache = IndicatorCache()
+
+    def lookup():
+        if args.csv_file:
+            return cache.get_csv(args.csv_file, args.indicator, **params)
+        return cache.get(args.symbol, args.interval, args.indicator, **params)
+
+    started = time.perf_counter()
+    lookup()
+    first_ms = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        lookup()
+    cached_ms = (time.perf_counter() - started) * 1000 / max(args.repeat, 1)
+    print(f"⚡ {args.indicator} {params}: first lookup {first_ms:.2f} ms, then {cached_ms:.3f} ms per lookup")
+    print(cache.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+Dual-mode technical indicators
+Every indicator has a batch function over full columns (backtests over
+history) and a streaming class whose update() is O(1) per new candle
+(live updates after an incremental crawl). Both modes run the same
+floating-point operations in the same order, so a streaming object fed
+the history reproduces the batch output bit for bit:
+  - rolling sums (SMA, Bollinger) are the cumsum of (new - oldest), which
+    is exactly the streaming `total += new - oldest`
+  - EMA/Wilder smoothing is a sequential recurrence; the batch version
+    runs it in one tight kernel (numba-compiled when installed)
+  - everything else is element-wise NumPy
+Batch outputs are NaN during warm-up; update() returns NaN until warm.
+"""
+
+import argparse
+import math
+import time
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+DAY_MS = 24 * 60 * 60 * 1000
+NAN = float('nan')
+
+
+# --- Kernels ------------------------------------------------------------
+
+def _smooth_loop(values, alpha, seed):
+    out = []
+    append = out.append
+    y = seed
+    for value in values.tolist():
+        y = y + alpha * (value - y)
+        append(y)
+    return np.array(out, dtype=np.float64)
+
+
+if numba is not None:
+    @numba.njit(cache=True)
+    def _smooth_jit(values, alpha, seed):
+        out = np.empty(len(values))
+        y = seed
+        for i in range(len(values)):
+            y = y + alpha * (values[i] - y)
+            out[i] = y
+        return out
+
+
+def _smooth(values, alpha, seed):
+    """y[i] = y[i-1] + alpha * (values[i] - y[i-1]), starting from `seed`"""
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    if numba is not None:
+        return _smooth_jit(values, alpha, seed)
+    return _smooth_loop(values, alpha, seed)
+
+
+def _sequential_sum(values):
+    """Left-to-right sum (np.sum is pairwise and would differ in the last bits)"""
+    return float(np.cumsum(values)[-1]) if len(values) else 0.0
+
+
+def _rolling_sum(values, length):
+    """Window sums at i >= length-1 as the running total used by the streaming classes"""
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) < length:
+        return np.empty(0)
+    deltas = np.empty(len(values) - length + 1)
+    deltas[0] = _sequential_sum(values[:length])
+    np.subtract(values[length:], values[:-length], out=deltas[1:])
+    return np.cumsum(deltas)
+
+
+def _padded(values, warmup, total):
+    out = np.full(total, np.nan)
+    out[warmup:] = values[:max(total - warmup, 0)]
+    return out
+
+
+# --- Batch ------------------------------------------------------------
+
+def sma(close, length):
+    close = np.asarray(close, dtype=np.float64)
+    return _padded(_rolling_sum(close, length) / length, length - 1, len(close))
+
+
+def ema(close, length, alpha=None):
+    """EMA seeded with the SMA of the first `length` values (alpha = 2 / (length + 1))"""
+    close = np.asarray(close, dtype=np.float64)
+    alpha = 2.0 / (length + 1) if alpha is None else alpha
+    if len(close) < length:
+        return np.full(len(close), np.nan)
+    seed = _sequential_sum(close[:length]) / length
+    return _padded(np.r_[seed, _smooth(close[length:], alpha, seed)], length - 1, len(close))
+
+
+def rsi(close, length=14):
+    """Wilder RSI (gains and losses smoothed with alpha = 1 / length)"""
+    close = np.asarray(close, dtype=np.float64)
+    delta = np.diff(close)
+    gains = np.maximum(delta, 0.0)
+    losses = np.maximum(-delta, 0.0)
+    average_gain = ema(gains, length, 1.0 / length)
+    average_loss = ema(losses, length, 1.0 / length)
+    with np.errstate(invalid='ignore'):
+        values = 100.0 * average_gain / (average_gain + average_loss)
+    values[(average_gain + average_loss) == 0] = 50.0  # Flat window
+    return np.r_[np.nan, values] if len(close) else values
+
+
+def true_range(high, low, close):
+    high, low, close = (np.asarray(values, dtype=np.float64) for values in (high, low, close))
+    ranges = high - low
+    if len(close) > 1:
+        previous = close[:-1]
+        ranges[1:] = np.maximum(ranges[1:], np.maximum(np.abs(high[1:] - previous), np.abs(low[1:] - previous)))
+    return ranges
+
+
+def atr(high, low, close, length=14):
+    """Wilder ATR (true range smoothed with alpha = 1 / length)"""
+    return ema(true_range(high, low, close), length, 1.0 / length)
+
+
+def bollinger(close, length=20, width=2.0):
+    """(middle, upper, lower) with the population standard deviation"""
+    close = np.asarray(close, dtype=np.float64)
+    total = _rolling_sum(close, length)
+    squares = _rolling_sum(close * close, length)
+    middle = total / length
+    deviation = np.sqrt(np.maximum(squares / length - middle * middle, 0.0))
+    bands = (middle, middle + width * deviation, middle - width * deviation)
+    return tuple(_padded(band, length - 1, len(close)) for band in bands)
+
+
+def macd(close, fast=12, slow=26, signal=9):
+    """(macd, signal, histogram)"""
+    close = np.asarray(close, dtype=np.float64)
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = np.full(len(close), np.nan)
+    if len(close) >= slow:
+        signal_line[slow - 1:] = ema(line[slow - 1:], signal)
+    return line, signal_line, line - signal_line
+
+
+def vwap(high, low, close, volume, open_time=None, session_ms=DAY_MS):
+    """
+    Volume-weighted typical price, reset at every `session_ms` boundary of
+    open_time (UTC days by default); cumulative over the whole series when
+    open_time or session_ms is None
+    """
+    high, low, close, volume = (np.asarray(values, dtype=np.float64) for values in (high, low, close, volume))
+    typical = (high + low + close) / 3.0
+    weighted = typical * volume
+    if open_time is None or session_ms is None:
+        starts = np.array([0])
+    else:
+        sessions = np.asarray(open_time, dtype=np.int64) // session_ms
+        starts = np.flatnonzero(np.r_[True, sessions[1:] != sessions[:-1]])
+    out = np.empty(len(close))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for start, end in zip(starts, np.r_[starts[1:], len(close)]):
+            out[start:end] = np.cumsum(weighted[start:end]) / np.cumsum(volume[start:end])
+    return out
+
+
+# --- Streaming -------------------------------------------------------------
+
+class SMA:
+    def __init__(self, length):
+        self.length = length
+        self.window = [0.0] * length  # Ring buffer
+        self.index = 0
+        self.count = 0
+        self.total = 0.0
+        self.value = NAN
+
+    def update(self, value):
+        value = float(value)
+        if self.count < self.length:
+            self.total = self.total + value
+            self.count += 1
+        else:
+            self.total = self.total + (value - self.window[self.index])
+        self.window[self.index] = value
+        self.index = (self.index + 1) % self.length
+        if self.count == self.length:
+            self.value = self.total / self.length
+        return self.value
+
+
+class EMA:
+    def __init__(self, length, alpha=None):
+        self.length = length
+        self.alpha = 2.0 / (length + 1) if alpha is None else alpha
+        self.count = 0
+        self.total = 0.0
+        self.value = NAN
+
+    def update(self, value):
+        value = float(value)
+        if self.count < self.length:
+            self.count += 1
+            self.total = self.total + value
+            if self.count == self.length:
+                self.value = self.total / self.length
+        else:
+            self.value = self.value + self.alpha * (value - self.value)
+        return self.value
+
+
+class RSI:
+    def __init__(self, length=14):
+        self.gains = EMA(length, 1.0 / length)
+        self.losses = EMA(length, 1.0 / length)
+        self.previous = None
+        self.value = NAN
+
+    def update(self, close):
+        close = float(close)
+        if self.previous is not None:
+            delta = close - self.previous
+            gain = self.gains.update(max(delta, 0.0))
+            loss = self.losses.update(max(-delta, 0.0))
+            if gain + loss == 0:
+                self.value = 50.0
+            elif not math.isnan(gain):
+                self.value = 100.0 * gain / (gain + loss)
+        self.previous = close
+        return self.value
+
+
+class ATR:
+    def __init__(self, length=14):
+        self.smoother = EMA(length, 1.0 / length)
+        self.previous = None
+        self.value = NAN
+
+    def update(self, high, low, close):
+        high, low = float(high), float(low)
+        value = high - low
+        if self.previous is not None:
+            value = max(value, max(abs(high - self.previous), abs(low - self.previous)))
+        self.previous = float(close)
+        self.value = self.smoother.update(value)
+        return self.value
+
+
+class Bollinger:
+    def __init__(self, length=20, width=2.0):
+        self.width = width
+        self.mean = SMA(length)
+        self.squares = SMA(length)
+        self.value = (NAN, NAN, NAN)
+
+    def update(self, close):
+        close = float(close)
+        self.mean.update(close)
+        self.squares.update(close * close)
+        if self.mean.count == self.mean.length:
+            length = self.mean.length
+            middle = self.mean.total / length
+            deviation = math.sqrt(max(self.squares.total / length - middle * middle, 0.0))
+            self.value = (middle, middle + self.width * deviation, middle - self.width * deviation)
+        return self.value
+
+
+class MACD:
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.fast = EMA(fast)
+        self.slow = EMA(slow)
+        self.signal = EMA(signal)
+        self.value = (NAN, NAN, NAN)
+
+    def update(self, close):
+        fast, slow = self.fast.update(close), self.slow.update(close)
+        line = fast - slow
+        if not math.isnan(line):
+            signal = self.signal.update(line)
+            self.value = (line, signal, line - signal)
+        return self.value
+
+
+class VWAP:
+    def __init__(self, session_ms=DAY_MS):
+        self.session_ms = session_ms
+        self.session = None
+        self.weighted = 0.0
+        self.volume = 0.0
+        self.value = NAN
+
+    def update(self, high, low, close, volume, open_time=None):
+        if self.session_ms is not None and open_time is not None:
+            session = int(open_time) // self.session_ms
+            if session != self.session:
+                self.session, self.weighted, self.volume = session, 0.0, 0.0
+        volume = float(volume)
+        self.weighted = self.weighted + (float(high) + float(low) + float(close)) / 3.0 * volume
+        self.volume = self.volume + volume
+        self.value = self.weighted / self.volume if self.volume != 0 else NAN
+        return self.value
+
+
+# name -> (batch function, streaming class, input columns)
+INDICATORS = {
+    'sma': (sma, SMA, ('close',)),
+    'ema': (ema, EMA, ('close',)),
+    'rsi': (rsi, RSI, ('close',)),
+    'atr': (atr, ATR, ('high', 'low', 'close')),
+    'bollinger': (bollinger, Bollinger, ('close',)),
+    'macd': (macd, MACD, ('close',)),
+    'vwap': (vwap, VWAP, ('high', 'low', 'close', 'volume', 'open_time')),
+}
+
+
+def compute(name, columns, **params):
+    """Batch indicator `name` over typed candle columns"""
+    batch, _, inputs = INDICATORS[name]
+    return batch(*(columns[column] for column in inputs), **params)
+
+
+def stream(name, columns, **params):
+    """Feed the columns through a fresh streaming object; same shape as compute()"""
+    _, streaming, inputs = INDICATORS[name]
+    indicator = streaming(**params)
+    rows = zip(*(np.asarray(columns[column]).tolist() for column in inputs))
+    values = [indicator.update(*row) for row in rows]
+    if values and isinstance(values[0], tuple):
+        return tuple(np.array(series, dtype=np.float64) for series in zip(*values))
+    return np.array(values, dtype=np.float64)
+
+
+DEFAULT_PARAMS = {
+    'sma': {'length': 20}, 'ema': {'length': 200}, 'rsi': {'length': 14}, 'atr': {'length': 14},
+    'bollinger': {'length': 20, 'width': 2.0}, 'macd': {'fast': 12, 'slow': 26, 'signal': 9}, 'vwap': {},
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute indicators in batch and streaming mode and compare them")
+    parser.add_argument("csv_file", nargs="?", help="Crawler CSV (default: the stored series)")
+    parser.add_argument("--symbol", default="BTCUSDT")
+    parser.add_argument("--interval", default="1h")
+    args = parser.parse_args()
+
+    columns_needed = ['open_time', 'high', 'low', 'close', 'volume']
+    if args.csv_file:
+        from csv_cache import load_csv
+        df = load_csv(args.csv_file, columns=columns_needed)
+    else:
+        from candle_store import CandleStore
+        df = CandleStore().read(args.symbol, args.interval, columns=columns_needed)
+    if len(df) == 0:
+        print(f"❌ No stored {args.symbol} {args.interval} candles")
+        return
+    columns = {name: df[name].to_numpy() for name in columns_needed}
+    columns['open_time'] = df['open_time'].to_numpy(dtype='datetime64[ms]').astype(np.int64)
+
+    print(f"📐 {len(df):,} candles ({'numba' if numba is not None else 'pure Python'} recurrence kernel)")
+    for name, params in DEFAULT_PARAMS.items():
+        started = time.perf_counter()
+        batch = compute(name, columns, **params)
+        batch_s = time.perf_counter() - started
+        started = time.perf_counter()
+        streamed = stream(name, columns, **params)
+        stream_s = time.perf_counter() - started
+
+        outputs = batch if isinstance(batch, tuple) else (batch,)
+        streamed = streamed if isinstance(streamed, tuple) else (streamed,)
+        identical = all(np.array_equal(a, b, equal_nan=True) for a, b in zip(outputs, streamed))
+        last = ", ".join(f"{series[-1]:.4f}" for series in outputs)
+        print(f"   {'✅' if identical else '❌'} {name:<10} batch {batch_s * 1000:7.2f} ms, "
+              f"stream {stream_s / len(df) * 1e6:5.2f} µs/candle, last: {last}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Streaming page-to-array kline converter
+Each page is written straight into preallocated typed column arrays
+(int64 ms timestamps, float64 prices) instead of piling up 12-element lists
+of strings; the DataFrame at the end is built on views of those arrays.
+"""
+
+import numpy as np
+import pandas as pd
+
+from binance_api import KLINE_COLUMNS
+
+# Column dtypes for the typed layout - 'ignore' is always "0" and dropped
+COLUMN_DTYPES = {
+    'open_time': np.int64,
+    'open': np.float64,
+    'high': np.float64,
+    'low': np.float64,
+    'close': np.float64,
+    'volume': np.float64,
+    'close_time': np.int64,
+    'quote_asset_volume': np.float64,
+    'number_of_trades': np.int64,
+    'taker_buy_base_asset_volume': np.float64,
+    'taker_buy_quote_asset_volume': np.float64,
+}
+BYTES_PER_ROW = sum(np.dtype(dtype).itemsize for dtype in COLUMN_DTYPES.values())
+
+# Position of each typed column inside a raw kline list
+COLUMN_INDEX = {name: KLINE_COLUMNS.index(name) for name in COLUMN_DTYPES}
+
+
+class KlineColumnBuilder:
+    def __init__(self, capacity=1000, max_bytes=None, on_spill=None):
+        """
+        `capacity` is the initial row count (pass the planned page count x
+        limit to avoid any regrowth). Arrays grow by 1.5x when full, but never
+        past `max_bytes`; at that ceiling the filled rows are handed to
+        `on_spill(df)` and the arrays are reused. Without on_spill, hitting
+        the ceiling raises MemoryError.
+        """
+        self.max_rows = None
+        if max_bytes is not None:
+            self.max_rows = max(1, int(max_bytes // BYTES_PER_ROW))
+            capacity = min(capacity, self.max_rows)
+        self.on_spill = on_spill
+        self.rows = 0
+        self.spilled_rows = 0
+        self.columns = {name: np.empty(max(1, capacity), dtype=dtype) for name, dtype in COLUMN_DTYPES.items()}
+
+    @property
+    def capacity(self):
+        return len(self.columns['open_time'])
+
+    @property
+    def nbytes(self):
+        return self.capacity * BYTES_PER_ROW
+
+    def _grow(self, needed):
+        new_capacity = max(needed, int(self.capacity * 1.5) + 1)
+        if self.max_rows is not None:
+            new_capacity = min(new_capacity, self.max_rows)
+        for name, values in self.columns.items():
+            grown = np.empty(new_capacity, dtype=values.dtype)
+            grown[:self.rows] = values[:self.rows]
+            self.columns[name] = grown
+
+    def spill(self):
+        """Hand the filled rows to on_spill and start over in the same arrays"""
+        if self.rows == 0:
+            return
+        if self.on_spill is None:
+            raise MemoryError(
+                f"Kline buffer reached its {self.max_rows * BYTES_PER_ROW:,} byte ceiling; "
+                "raise max_bytes or pass on_spill"
+            )
+        # on_spill must consume the frame before returning - the arrays are reused
+        self.on_spill(self.to_dataframe())
+        self.spilled_rows += self.rows
+        self.rows = 0
+
+    def append_page(self, page):
+        """Convert one klines response page straight into the column arrays"""
+        if not isinstance(page, list):
+            return self.append_columns(page)  # Already typed (KlinePage)
+        while page:
+            if self.rows == self.capacity:
+                if self.max_rows is not None and self.capacity >= self.max_rows:
+                    self.spill()
+                else:
+                    self._grow(self.rows + len(page))
+
+            take = min(len(page), self.capacity - self.rows)
+            chunk = page[:take] if take < len(page) else page
+            fields = list(zip(*chunk))  # Transpose rows to per-column tuples
+            end = self.rows + take
+            for name, values in self.columns.items():
+                values[self.rows:end] = np.asarray(fields[COLUMN_INDEX[name]], dtype=values.dtype)
+            self.rows = end
+            page = page[take:]
+
+    def append_columns(self, columns):
+        """Append already-typed column arrays (e.g. from the fast parser)"""
+        count = len(columns['open_time'])
+        start = 0
+        while start < count:
+            if self.rows == self.capacity:
+                if self.max_rows is not None and self.capacity >= self.max_rows:
+                    self.spill()
+                else:
+                    self._grow(self.rows + count - start)
+            take = min(count - start, self.capacity - self.rows)
+            end = self.rows + take
+            for name, values in self.columns.items():
+                values[self.rows:end] = columns[name][start:start + take]
+            self.rows = end
+            start += take
+
+    def to_dataframe(self, sort=False):
+        """
+        DataFrame on views of the filled rows - no copy unless `sort` has to
+        reorder out-of-order pages. Time columns come back as datetime64[ms].
+        """
+        data = {}
+        for name, values in self.columns.items():
+            view = values[:self.rows]
+            if name in ('open_time', 'close_time'):
+                view = view.view('datetime64[ms]')
+            data[name] = view
+        df = pd.DataFrame(data, copy=False)
+
+        if sort and self.rows > 1:
+            open_time = self.columns['open_time'][:self.rows]
+            if np.any(open_time[1:] < open_time[:-1]):
+                df = df.iloc[np.argsort(open_time, kind='stable')].reset_index(drop=True)
+        return df
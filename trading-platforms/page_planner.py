@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Page-aligned time partition planner
+Computes the exact [startTime, endTime] windows of a crawl from interval
+arithmetic: every window starts on a candle open time and covers exactly
+`limit` open times, so each request returns a full page and no two windows
+can return the same candle. Only the last window may be shorter.
+"""
+
+from binance_api import KLINES_ENDPOINT, MAX_LIMIT, interval_to_ms
+from rate_limiter import rate_limited_get
+
+# Candle grids that do not start at the epoch - weekly candles open on
+# Monday 00:00 UTC while 1970-01-01 was a Thursday
+INTERVAL_OFFSET_MS = {
+    '1w': 4 * 24 * 60 * 60 * 1000,
+}
+
+
+def interval_offset(interval):
+    return INTERVAL_OFFSET_MS.get(interval, 0)
+
+
+def align_down(ms, interval):
+    """Open time of the candle containing `ms`"""
+    step = interval_to_ms(interval)
+    offset = interval_offset(interval)
+    return (ms - offset) // step * step + offset
+
+
+def align_up(ms, interval):
+    """First candle open time at or after `ms`"""
+    aligned = align_down(ms, interval)
+    return aligned if aligned == ms else aligned + interval_to_ms(interval)
+
+
+def candle_count(start_ms, end_ms, interval):
+    """Number of candle open times in [start_ms, end_ms]"""
+    first = align_up(start_ms, interval)
+    if first > end_ms:
+        return 0
+    return (end_ms - first) // interval_to_ms(interval) + 1
+
+
+def plan_pages(start_ms, end_ms, interval, limit=MAX_LIMIT):
+    """
+    Non-overlapping page windows covering [start_ms, end_ms].
+    Window i is [first + i*limit*step, first + (i+1)*limit*step - 1], i.e.
+    exactly `limit` open times; the last one is clipped at end_ms.
+    """
+    step = interval_to_ms(interval)
+    span = limit * step
+    current = align_up(start_ms, interval)
+    windows = []
+    while current <= end_ms:
+        windows.append((current, min(current + span - 1, end_ms)))
+        current += span
+    return windows
+
+
+def split_pages(windows, parts):
+    """Split a page plan into `parts` contiguous runs of whole pages"""
+    parts = max(1, min(parts, len(windows)))
+    size, extra = divmod(len(windows), parts)
+    runs = []
+    start = 0
+    for i in range(parts):
+        end = start + size + (1 if i < extra else 0)
+        if end > start:
+            runs.append(windows[start:end])
+        start = end
+    return runs
+
+
+def listing_time(symbol, interval):
+    """Open time (ms) of the first candle Binance has for a series, or None"""
+    params = {'symbol': symbol, 'interval': interval, 'startTime': 0, 'limit': 1}
+    response = rate_limited_get(KLINES_ENDPOINT, params=params, timeout=30)
+    response.raise_for_status()
+    data = response.json()
+    return data[0][0] if data else None
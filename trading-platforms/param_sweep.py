@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Parallel parameter sweep over shared-memory candle arrays
+The candle columns are copied once into multiprocessing.shared_memory;
+ProcessPoolExecutor workers attach to them by name (zero-copy), so each
+task only ships a small list of parameter dicts and gets metrics back.
+Results are appended to a CSV as chunks complete, and a re-run with the
+same output file skips every combination already in it.
+"""
+
+import argparse
+import csv
+import itertools
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from backtest_vectorized import load_bars, run_backtest, synthetic_bars
+
+METRICS = ['total_return', 'max_drawdown', 'sharpe', 'trades', 'exposure']
+
+_worker_columns = None  # Set in each worker by _init_worker
+_worker_segments = []
+
+
+class SharedColumns:
+    """Numeric columns in shared memory, described by a picklable spec"""
+
+    def __init__(self, columns):
+        self.segments = []
+        self.spec = {}
+        for name, values in columns.items():
+            values = np.ascontiguousarray(values)
+            segment = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+            np.ndarray(values.shape, values.dtype, buffer=segment.buf)[:] = values
+            self.segments.append(segment)
+            self.spec[name] = (segment.name, values.dtype.str, values.shape)
+
+    @staticmethod
+    def attach(spec):
+        """(arrays, segments) - keep the segments referenced while the arrays are used"""
+        arrays, segments = {}, []
+        for name, (segment_name, dtype, shape) in spec.items():
+            # Pool workers share the parent's resource tracker, so attaching
+            # does not hand ownership over - only the parent unlinks
+            segment = shared_memory.SharedMemory(name=segment_name)
+            segments.append(segment)
+            arrays[name] = np.ndarray(shape, np.dtype(dtype), buffer=segment.buf)
+            arrays[name].flags.writeable = False
+        return arrays, segments
+
+    def close(self):
+        for segment in self.segments:
+            segment.close()
+            segment.unlink()
+        self.segments = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _init_worker(spec):
+    global _worker_columns, _worker_segments
+    _worker_columns, _worker_segments = SharedColumns.attach(spec)
+
+
+def _run_chunk(evaluate, chunk, fixed):
+    return [(params, evaluate(_worker_columns, **params, **fixed)) for params in chunk]
+
+
+def sma_cross_metrics(columns, fast, slow, band=0.0, fee=0.001, slippage=0.0005, interval='1h'):
+    """
+    Example objective: long when SMA(fast) is more than `band` above
+    SMA(slow), short when more than `band` below, flat in between
+    """
+    close = columns['close']
+    cumulative = np.cumsum(np.r_[0.0, close])
+    fast_sma = np.full(len(close), np.nan)
+    slow_sma = np.full(len(close), np.nan)
+    fast_sma[fast - 1:] = (cumulative[fast:] - cumulative[:-fast]) / fast
+    slow_sma[slow - 1:] = (cumulative[slow:] - cumulative[:-slow]) / slow
+    with np.errstate(invalid='ignore'):
+        spread = fast_sma / slow_sma - 1
+        positions = np.where(spread > band, 1.0, np.where(spread < -band, -1.0, 0.0))
+    result = run_backtest(columns['open'], close, positions, fee, slippage, interval=interval)
+    return {
+        'total_return': result.total_return,
+        'max_drawdown': result.max_drawdown,
+        'sharpe': result.sharpe,
+        'trades': result.trade_count,
+        'exposure': float(np.mean(result.exposure != 0)),
+    }
+
+
+def param_grid(ranges, where=None):
+    """Every combination of {name: values} as dicts, optionally filtered by `where(params)`"""
+    names = list(ranges)
+    combos = (dict(zip(names, values)) for values in itertools.product(*ranges.values()))
+    return [params for params in combos if where is None or where(params)]
+
+
+def _key(params, names):
+    return tuple(str(params[name]) for name in names)
+
+
+def _drop_partial_row(output_file):
+    """Cut a row left half-written by a killed run"""
+    with open(output_file, 'rb+') as f:
+        data = f.read()
+        if data and not data.endswith(b'\n'):
+            f.truncate(data.rfind(b'\n') + 1)
+
+
+def completed_keys(output_file, names):
+    """Parameter keys already in a results CSV (for resuming)"""
+    if not os.path.exists(output_file):
+        return set()
+    _drop_partial_row(output_file)
+    with open(output_file, newline='') as f:
+        return {tuple(row[name] for name in names) for row in csv.DictReader(f)}
+
+
+def run_sweep(columns, grid, output_file, evaluate=sma_cross_metrics, fixed=None, workers=None,
+              chunk_size=16, metrics=METRICS, verbose=True):
+    """
+    Evaluate `evaluate(columns, **params, **fixed)` for every dict in `grid`
+    across worker processes and stream rows to `output_file`. `evaluate`
+    must be a module-level function. Returns the number of combinations
+    evaluated in this run.
+    """
+    fixed = fixed or {}
+    workers = workers or os.cpu_count() or 1
+    names = list(grid[0]) if grid else []
+    done = completed_keys(output_file, names)
+    todo = [params for params in grid if _key(params, names) not in done]
+    if verbose:
+        print(f"🧮 {len(grid):,} combinations, {len(grid) - len(todo):,} already done, "
+              f"{len(todo):,} to run on {workers} worker(s)")
+    if not todo:
+        return 0
+
+    chunks = [todo[i:i + chunk_size] for i in range(0, len(todo), chunk_size)]
+    new_file = not os.path.exists(output_file) or os.path.getsize(output_file) == 0
+    evaluated = 0
+    started = time.perf_counter()
+
+    with SharedColumns(columns) as shared, open(output_file, 'a', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=names + list(metrics))
+        if new_file:
+            writer.writeheader()
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(shared.spec,)) as executor:
+            queue = iter(chunks)
+            in_flight = set()
+            while True:
+                # A few chunks per worker in flight - results stream back as they finish
+                while len(in_flight) < workers * 4:
+                    chunk = next(queue, None)
+                    if chunk is None:
+                        break
+                    in_flight.add(executor.submit(_run_chunk, evaluate, chunk, fixed))
+                if not in_flight:
+                    break
+                finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    for params, result in future.result():
+                        writer.writerow({**params, **result})
+                        evaluated += 1
+                f.flush()
+                if verbose:
+                    rate = evaluated / (time.perf_counter() - started)
+                    print(f"\r⚡ {evaluated:,}/{len(todo):,} combinations ({rate:,.1f}/s)", end="", flush=True)
+    if verbose:
+        print()
+    return evaluated
+
+
+def parse_range(text, kind=float):
+    """'start:stop:step' (stop inclusive) or 'a,b,c' -> list of values"""
+    if ':' in text:
+        start, stop, step = (kind(part) for part in text.split(':'))
+        return [kind(value) for value in np.arange(start, stop + step / 2, step)]
+    return [kind(part) for part in text.split(',')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel SMA-crossover parameter sweep over stored candles")
+    parser.add_argument("--symbol", default="BTCUSDT")
+    parser.add_argument("--interval", default="1h")
+    parser.add_argument("--fast", default="5:250:5", help="start:stop:step or a,b,c")
+    parser.add_argument("--slow", default="20:510:10")
+    parser.add_argument("--band", default="0:0.009:0.001")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk-size", type=int, default=16)
+    parser.add_argument("--output", default="sweep_results.csv")
+    parser.add_argument("--synthetic", type=int, help="Sweep N synthetic 1m bars instead of the store")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.synthetic:
+        bars, interval = synthetic_bars(args.synthetic), '1m'
+    else:
+        bars, interval = load_bars(args.symbol, args.interval), args.interval
+    if len(bars['close']) == 0:
+        print(f"❌ No stored {args.symbol} {args.interval} candles")
+        return
+
+    grid = param_grid({
+        'fast': parse_range(args.fast, int),
+        'slow': parse_range(args.slow, int),
+        'band': [round(value, 6) for value in parse_range(args.band)],
+    }, where=lambda params: params['fast'] < params['slow'])
+
+    columns = {'open': bars['open'], 'close': bars['close']}
+    started = time.perf_counter()
+    evaluated = run_sweep(columns, grid, args.output, fixed={'interval': interval}, workers=args.workers,
+                          chunk_size=args.chunk_size)
+    elapsed = time.perf_counter() - started
+    if evaluated:
+        print(f"✅ {evaluated:,} combinations over {len(columns['close']):,} bars in {elapsed:.1f}s")
+
+    results = pd.read_csv(args.output)
+    print(f"\n🏆 Top {args.top} by Sharpe ({args.output}):")
+    print(results.sort_values('sharpe', ascending=False).head(args.top).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
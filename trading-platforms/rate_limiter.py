@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Weight-aware rate limiter shared by every crawler thread and asyncio task
+Token bucket sized to the Binance REQUEST_WEIGHT budget, kept in sync with
+the X-MBX-USED-WEIGHT-1m and Retry-After response headers
+"""
+
+import asyncio
+import threading
+import time
+from urllib.parse import urlparse
+
+from http_client import http_get
+
+# Binance spot REQUEST_WEIGHT limit per IP per minute
+DEFAULT_WEIGHT_LIMIT = 6000
+
+# Request weight per endpoint path (see Binance spot API docs)
+ENDPOINT_WEIGHTS = {
+    '/api/v3/klines': 2,
+    '/api/v3/time': 1,
+    '/api/v3/ping': 1,
+    '/api/v3/exchangeInfo': 20,
+    '/api/v3/ticker/price': 2,
+}
+
+
+def endpoint_weight(url, params=None):
+    """Request weight of a call to `url` with `params`"""
+    path = urlparse(url).path
+    if path == '/api/v3/ticker/price' and not (params or {}).get('symbol') and 'symbol=' not in url:
+        return 4  # All symbols
+    return ENDPOINT_WEIGHTS.get(path, 1)
+
+
+class WeightRateLimiter:
+    def __init__(self, weight_limit=DEFAULT_WEIGHT_LIMIT, safety=0.95, burst_fraction=0.1):
+        """
+        `safety` is the share of the server limit we allow ourselves to use.
+        The bucket holds `burst` tokens and refills at (budget - burst) / 60s,
+        so no 60 second window can ever spend more than the budget.
+        """
+        self.weight_limit = weight_limit
+        self.budget = int(weight_limit * safety)
+        self.burst = max(1, int(self.budget * burst_fraction))
+        self.rate = (self.budget - self.burst) / 60.0  # Tokens per second
+        self.tokens = float(self.burst)
+        self.last_refill = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+        self.used_weight = 0  # Last value reported by the server
+        self.throttled_count = 0
+
+    def _refill(self, now):
+        elapsed = now - self.last_refill
+        if elapsed > 0:
+            self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+            self.last_refill = now
+
+    def reserve(self, weight=1):
+        """
+        Reserve `weight` tokens and return how many seconds the caller must
+        wait before sending. Reservations are first come, first served.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= weight
+            wait = 0.0
+            if self.tokens < 0:
+                wait = -self.tokens / self.rate
+            return max(wait, self.blocked_until - now)
+
+    def acquire(self, weight=1):
+        """Blocking acquire for threads"""
+        wait = self.reserve(weight)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, weight=1):
+        """Non-blocking acquire for asyncio tasks"""
+        wait = self.reserve(weight)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def update_from_headers(self, headers, status_code=200):
+        """Sync the bucket with what the server says we have used"""
+        with self.lock:
+            now = time.monotonic()
+
+            used = headers.get('X-MBX-USED-WEIGHT-1m')
+            if used is not None:
+                self.used_weight = int(used)
+                # Other processes on this IP count too - never assume more
+                # headroom than the server reports for the current minute
+                self._refill(now)
+                self.tokens = min(self.tokens, float(self.budget - self.used_weight))
+                if self.used_weight >= self.budget:
+                    self.blocked_until = max(self.blocked_until, now + seconds_to_next_minute())
+
+            if status_code in (418, 429):
+                self.throttled_count += 1
+                retry_after = headers.get('Retry-After')
+                wait = float(retry_after) if retry_after else seconds_to_next_minute()
+                self.blocked_until = max(self.blocked_until, now + wait)
+                self.tokens = min(self.tokens, 0.0)
+                return wait
+
+        return 0.0
+
+    def update_from_response(self, response):
+        """Convenience wrapper around update_from_headers"""
+        return self.update_from_headers(response.headers, response.status_code)
+
+
+def seconds_to_next_minute():
+    """Binance weight windows reset on wall-clock minute boundaries"""
+    return 60.0 - (time.time() % 60.0)
+
+
+# One limiter per process - all crawlers share the same IP budget
+BINANCE_LIMITER = WeightRateLimiter()
+
+
+def rate_limited_get(url, params=None, limiter=None, **kwargs):
+    """Pooled GET that waits for the weight budget and syncs from headers"""
+    limiter = limiter or BINANCE_LIMITER
+    limiter.acquire(endpoint_weight(url, params))
+    response = http_get(url, params=params, **kwargs)
+    wait = limiter.update_from_response(response)
+    if response.status_code in (418, 429):
+        print(f"   ⏳ Rate limited ({response.status_code}), all requests paused for {wait:.0f}s")
+    return response
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Vectorized OHLCV resampler with cached higher timeframes
+Builds 4h/1d/1w/... candles from a stored base series (1m or 1h) instead
+of refetching them from Binance. Derived series live in their own candle
+store next to the base store; each one records the base partition versions
+it was built from, so an update only recomputes the months whose base
+partitions changed since the last run.
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+
+from binance_api import interval_to_ms
+from candle_store import STORE_COLUMNS, STORE_DTYPES, CandleStore, columns_to_dataframe, sibling_root
+from page_planner import align_down
+
+DERIVED_NAME = "derived"  # <store>_derived beside the base store
+SOURCES_FILE = "_sources.json"
+
+# How each column combines across the base candles of one bucket
+AGGREGATIONS = {
+    'open': 'first',
+    'high': 'max',
+    'low': 'min',
+    'close': 'last',
+    'volume': 'sum',
+    'quote_asset_volume': 'sum',
+    'number_of_trades': 'sum',
+    'taker_buy_base_asset_volume': 'sum',
+    'taker_buy_quote_asset_volume': 'sum',
+}
+
+
+def check_resample(base_interval, target_interval):
+    """Target candles must be a whole number of base candles"""
+    base_step = interval_to_ms(base_interval)
+    target_step = interval_to_ms(target_interval)
+    if target_step <= base_step or target_step % base_step:
+        raise ValueError(f"Cannot resample {base_interval} candles to {target_interval}")
+    return target_step // base_step
+
+
+def resample_columns(columns, target_interval):
+    """
+    Aggregate sorted base column arrays (int64 ms times) into target
+    candles in one pass: buckets start where the aligned open time changes
+    and every aggregate is a single ufunc.reduceat call.
+    Buckets with missing base candles are still emitted from what exists,
+    like the exchange does for the candle that is still open.
+    """
+    open_time = np.asarray(columns['open_time'], dtype=np.int64)
+    if len(open_time) == 0:
+        return {name: np.empty(0, dtype=STORE_DTYPES[name]) for name in STORE_COLUMNS}
+
+    buckets = align_down(open_time, target_interval)
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(open_time)] - 1
+
+    result = {
+        'open_time': buckets[starts],
+        'close_time': buckets[starts] + interval_to_ms(target_interval) - 1,
+    }
+    for name, how in AGGREGATIONS.items():
+        values = np.asarray(columns[name], dtype=STORE_DTYPES[name])
+        if how == 'first':
+            result[name] = values[starts]
+        elif how == 'last':
+            result[name] = values[ends]
+        elif how == 'max':
+            result[name] = np.maximum.reduceat(values, starts)
+        elif how == 'min':
+            result[name] = np.minimum.reduceat(values, starts)
+        else:
+            result[name] = np.add.reduceat(values, starts)
+    return {name: result[name] for name in STORE_COLUMNS}
+
+
+def month_bounds(month):
+    """[start_ms, end_ms) of a 'YYYY-MM' partition"""
+    start = np.datetime64(month, 'M')
+    return int(start.astype('datetime64[ms]').astype(np.int64)), \
+        int((start + 1).astype('datetime64[ms]').astype(np.int64))
+
+
+class Resampler:
+    def __init__(self, store=None, derived_store=None):
+        self.store = store or CandleStore()
+        self.derived = derived_store or CandleStore(sibling_root(self.store.root, DERIVED_NAME))
+
+    def derived_interval(self, target_interval, base_interval):
+        # Kept apart from crawled series of the same interval
+        return f"{target_interval}-from-{base_interval}"
+
+    def _sources_path(self, symbol, target_interval, base_interval):
+        series_dir = self.derived.series_dir(symbol, self.derived_interval(target_interval, base_interval))
+        return os.path.join(series_dir, SOURCES_FILE)
+
+    def _load_sources(self, symbol, target_interval, base_interval):
+        path = self._sources_path(symbol, target_interval, base_interval)
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
+    def _save_sources(self, symbol, target_interval, base_interval, sources):
+        path = self._sources_path(symbol, target_interval, base_interval)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(sources, f, indent=2, sort_keys=True)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def stale_months(self, symbol, base_interval, target_interval):
+        """Base partitions whose published version differs from the one last resampled"""
+        sources = self._load_sources(symbol, target_interval, base_interval)
+        stale = {}
+        for month in self.store.partitions(symbol, base_interval):
+            version = self.store.partition_version(symbol, base_interval, month)
+            if sources.get(month) != version:
+                stale[month] = version
+        return stale
+
+    def update(self, symbol, base_interval, target_interval):
+        """Recompute the derived buckets overlapping changed base months; returns those months"""
+        check_resample(base_interval, target_interval)
+        stale = self.stale_months(symbol, base_interval, target_interval)
+        if not stale:
+            return []
+
+        step = interval_to_ms(target_interval)
+        derived_interval = self.derived_interval(target_interval, base_interval)
+        for month in sorted(stale):
+            # Whole target buckets around the month - a week can straddle two
+            month_start, month_end = month_bounds(month)
+            start = align_down(month_start, target_interval)
+            end = align_down(month_end - 1, target_interval) + step
+            base = self.store.load_range(symbol, base_interval, start, end, as_frame=False)
+            candles = resample_columns(base, target_interval)
+            if len(candles['open_time']):
+                self.derived.write(symbol, derived_interval, columns_to_dataframe(candles))
+
+        sources = self._load_sources(symbol, target_interval, base_interval)
+        sources.update(stale)
+        self._save_sources(symbol, target_interval, base_interval, sources)
+        return sorted(stale)
+
+    def load(self, symbol, target_interval, base_interval='1h', start=None, end=None, columns=None):
+        """Higher-timeframe candles, bringing the cache up to date first"""
+        self.update(symbol, base_interval, target_interval)
+        derived_interval = self.derived_interval(target_interval, base_interval)
+        if start is None and end is None:
+            return self.derived.read(symbol, derived_interval, columns=columns)
+        if start is None:
+            start = 0
+        if end is None:
+            months = self.derived.partitions(symbol, derived_interval)
+            end = month_bounds(months[-1])[1] if months else 0
+        return self.derived.load_range(symbol, derived_interval, start, end, columns=columns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Derive higher-timeframe candles from a stored base series")
+    parser.add_argument("--symbol", default="BTCUSDT")
+    parser.add_argument("--base", default="1h")
+    parser.add_argument("--targets", nargs="+", default=['4h', '1d', '1w'])
+    args = parser.parse_args()
+
+    resampler = Resampler()
+    for target in args.targets:
+        months = resampler.update(args.symbol, args.base, target)
+        df = resampler.load(args.symbol, target, args.base)
+        print(f"🕯️  {args.symbol} {target} from {args.base}: {len(df):,} candles "
+              f"({len(months)} base month(s) recomputed)")
+
+
+if __name__ == "__main__":
+    main()
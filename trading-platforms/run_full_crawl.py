@@ -1,9 +1,14 @@
 #!/usr/bin/env python3
 """
 Run full BTCUSDT crawl without interactive prompts
+Incremental by default: only candles newer than the checkpoint are fetched.
+Pass --full to re-download the whole history, --csv to also export a CSV,
+--sql to also upsert every page into the embedded SQL store (candles.db).
 """
 
 from btc_crawler import BTCUSDTCrawler
+from sql_store import SqlCandleStore
+import sys
 import time
 
 def main():
@@ -12,11 +17,13 @@ def main():
     
     crawler = BTCUSDTCrawler()
     
-    # Run full crawl
-    output_file = "btcusdt_hourly_all.csv"
+    # Run full crawl - the candle store is the sink, CSV is an optional export
+    output_file = "btcusdt_hourly_all.csv" if "--csv" in sys.argv else None
     
     start_time = time.time()
-    df = crawler.crawl_all_data(output_file)
+    resume = "--full" not in sys.argv
+    sql_store = SqlCandleStore() if "--sql" in sys.argv else None
+    df = crawler.crawl_all_data(output_file, resume=resume, sql_store=sql_store)
     end_time = time.time()
     
     if df is not None:
@@ -25,7 +32,8 @@ def main():
         print(f"📊 Dataset summary:")
         print(f"   • Records: {len(df):,}")
         print(f"   • Time span: {(df['open_time'].max() - df['open_time'].min()).days} days")
-        print(f"   • File: {output_file}")
+        if output_file:
+            print(f"   • CSV: {output_file}")
         print(f"\n🎯 Ready for backtesting! 🚀")
         
         # Show some key statistics
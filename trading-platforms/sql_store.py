@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Embedded SQL sink for crawled candles
+SQLite by default (DuckDB when installed and asked for) with a
+(symbol, interval, open_time) primary key. Pages are upserted in one
+transaction per batch, and a per-day aggregate table is refreshed for the
+touched days in the same transaction, so rollups like "max high per month
+across all symbols" read a few thousand daily rows instead of every candle.
+"""
+
+import argparse
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from binance_api import interval_to_ms
+from candle_store import STORE_COLUMNS, CandleStore, dataframe_to_columns
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+DEFAULT_SQL_STORE = "candles.db"
+DAY_MS = 24 * 60 * 60 * 1000
+
+COLUMN_TYPES = {
+    'open_time': 'BIGINT',
+    'open': 'DOUBLE',
+    'high': 'DOUBLE',
+    'low': 'DOUBLE',
+    'close': 'DOUBLE',
+    'volume': 'DOUBLE',
+    'close_time': 'BIGINT',
+    'quote_asset_volume': 'DOUBLE',
+    'number_of_trades': 'BIGINT',
+    'taker_buy_base_asset_volume': 'DOUBLE',
+    'taker_buy_quote_asset_volume': 'DOUBLE',
+}
+SUM_COLUMNS = ['volume', 'quote_asset_volume', 'number_of_trades',
+               'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume']
+
+SCHEMA = [
+    f"""CREATE TABLE IF NOT EXISTS candles (
+        symbol TEXT NOT NULL,
+        "interval" TEXT NOT NULL,
+        {', '.join(f'{name} {sql_type} NOT NULL' for name, sql_type in COLUMN_TYPES.items())},
+        PRIMARY KEY (symbol, "interval", open_time)
+    )""",
+    # Cross-symbol time slices ("every 1h candle on 2024-03-12")
+    'CREATE INDEX IF NOT EXISTS candles_interval_time ON candles ("interval", open_time)',
+    f"""CREATE TABLE IF NOT EXISTS daily_candles (
+        symbol TEXT NOT NULL,
+        "interval" TEXT NOT NULL,
+        day BIGINT NOT NULL,
+        open DOUBLE NOT NULL,
+        high DOUBLE NOT NULL,
+        low DOUBLE NOT NULL,
+        close DOUBLE NOT NULL,
+        {', '.join(f'{name} {COLUMN_TYPES[name]} NOT NULL' for name in SUM_COLUMNS)},
+        candles BIGINT NOT NULL,
+        PRIMARY KEY (symbol, "interval", day)
+    )""",
+    'CREATE INDEX IF NOT EXISTS daily_candles_day ON daily_candles (day)',
+]
+
+# Recompute the daily rows of one series for days in [?, ?)
+REFRESH_DAILY = f"""
+INSERT OR REPLACE INTO daily_candles
+SELECT symbol, "interval", day,
+       MAX(CASE WHEN open_time = first_time THEN open END),
+       MAX(high), MIN(low),
+       MAX(CASE WHEN open_time = last_time THEN close END),
+       {', '.join(f'SUM({name})' for name in SUM_COLUMNS)},
+       COUNT(*)
+FROM (
+    SELECT *, open_time - open_time % {DAY_MS} AS day,
+           MIN(open_time) OVER (PARTITION BY open_time - open_time % {DAY_MS}) AS first_time,
+           MAX(open_time) OVER (PARTITION BY open_time - open_time % {DAY_MS}) AS last_time
+    FROM candles
+    WHERE symbol = ? AND "interval" = ? AND open_time >= ? AND open_time < ?
+) AS bucketed
+GROUP BY symbol, "interval", day
+"""
+
+# 'YYYY-MM' of a day column, per dialect
+MONTH_EXPR = {
+    'sqlite': "strftime('%Y-%m', day / 1000, 'unixepoch')",
+    'duckdb': "strftime(to_timestamp(day / 1000), '%Y-%m')",
+}
+
+# Common rollups, all answered from daily_candles
+ROLLUPS = {
+    'monthly_high': """
+        SELECT symbol, "interval", {month} AS month, MAX(high) AS max_high
+        FROM daily_candles GROUP BY symbol, "interval", month ORDER BY symbol, "interval", month""",
+    'monthly_volume': """
+        SELECT symbol, "interval", {month} AS month, SUM(volume) AS volume, SUM(quote_asset_volume) AS quote_volume
+        FROM daily_candles GROUP BY symbol, "interval", month ORDER BY symbol, "interval", month""",
+    'daily_range': """
+        SELECT symbol, "interval", day, high - low AS price_range, (high - low) / open AS range_pct
+        FROM daily_candles ORDER BY symbol, "interval", day""",
+    'coverage': """
+        SELECT symbol, "interval", COUNT(*) AS days, SUM(candles) AS candles, MIN(day) AS first_day, MAX(day) AS last_day
+        FROM daily_candles GROUP BY symbol, "interval" ORDER BY symbol, "interval"
+    """,
+}
+
+
+class SqlCandleStore:
+    def __init__(self, path=DEFAULT_SQL_STORE, backend='sqlite'):
+        """backend: 'sqlite', 'duckdb' (must be installed) or 'auto' (duckdb if installed)"""
+        if backend == 'auto':
+            backend = 'duckdb' if duckdb is not None else 'sqlite'
+        if backend == 'duckdb' and duckdb is None:
+            raise ImportError("duckdb is not installed - pip install duckdb or use backend='sqlite'")
+        if backend not in MONTH_EXPR:
+            raise ValueError(f"Unknown SQL backend {backend!r}")
+
+        self.path = path
+        self.backend = backend
+        if backend == 'sqlite':
+            # Autocommit mode - upsert() opens and commits its own transactions
+            self.connection = sqlite3.connect(path, isolation_level=None)
+            self.connection.execute('PRAGMA journal_mode=WAL')
+            self.connection.execute('PRAGMA synchronous=NORMAL')
+        else:
+            self.connection = duckdb.connect(path)
+        for statement in SCHEMA:
+            self.connection.execute(statement)
+
+    def upsert(self, symbol, interval, data):
+        """
+        Insert or replace candles (DataFrame or column dict) in one
+        transaction and refresh the daily aggregates of the touched days
+        """
+        columns = data if isinstance(data, dict) else dataframe_to_columns(data)
+        rows = len(columns['open_time'])
+        if rows == 0:
+            return 0
+
+        frame = pd.DataFrame({name: np.asarray(columns[name]) for name in STORE_COLUMNS}, copy=False)
+        frame.insert(0, 'interval', interval)
+        frame.insert(0, 'symbol', symbol)
+
+        open_time = np.asarray(columns['open_time'], dtype=np.int64)
+        first_day = int(open_time.min()) // DAY_MS * DAY_MS
+        last_day = int(open_time.max()) // DAY_MS * DAY_MS + DAY_MS
+
+        cursor = self.connection.cursor()
+        try:
+            if self.backend == 'sqlite':
+                cursor.execute('BEGIN')
+                placeholders = ', '.join('?' * len(frame.columns))
+                cursor.executemany(f'INSERT OR REPLACE INTO candles VALUES ({placeholders})',
+                                   frame.itertuples(index=False, name=None))
+            else:
+                cursor.execute('BEGIN TRANSACTION')
+                cursor.register('batch', frame)
+                cursor.execute('INSERT OR REPLACE INTO candles SELECT * FROM batch')
+                cursor.unregister('batch')
+
+            # Daily rows only make sense for candles no longer than a day
+            if interval_to_ms(interval) <= DAY_MS:
+                cursor.execute(REFRESH_DAILY, (symbol, interval, first_day, last_day))
+            cursor.execute('COMMIT')
+        except Exception:
+            cursor.execute('ROLLBACK')
+            raise
+        return rows
+
+    def query(self, sql, params=()):
+        """Run any SQL and return a DataFrame"""
+        if self.backend == 'sqlite':
+            return pd.read_sql_query(sql, self.connection, params=params)
+        return self.connection.execute(sql, params).df()
+
+    def rollup(self, name):
+        """One of the pre-built ROLLUPS, answered from the daily table"""
+        return self.query(ROLLUPS[name].format(month=MONTH_EXPR[self.backend]))
+
+    def count(self, symbol=None, interval=None):
+        sql = 'SELECT COUNT(*) AS n FROM candles WHERE (? IS NULL OR symbol = ?) AND (? IS NULL OR "interval" = ?)'
+        return int(self.query(sql, (symbol, symbol, interval, interval))['n'].iloc[0])
+
+    def close(self):
+        self.connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load candles into the embedded SQL store and run rollups")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = subparsers.add_parser("import", help="Upsert a stored series or crawler CSVs")
+    import_parser.add_argument("csv_files", nargs="*", help="Crawler CSVs (default: the candle store series)")
+    import_parser.add_argument("--symbol", default="BTCUSDT")
+    import_parser.add_argument("--interval", default="1h")
+
+    rollup_parser = subparsers.add_parser("rollup", help="Run a pre-built rollup")
+    rollup_parser.add_argument("name", choices=list(ROLLUPS))
+
+    query_parser = subparsers.add_parser("query", help="Run an ad-hoc SQL query")
+    query_parser.add_argument("sql")
+
+    parser.add_argument("--db", default=DEFAULT_SQL_STORE)
+    parser.add_argument("--backend", choices=['sqlite', 'duckdb', 'auto'], default='sqlite')
+    args = parser.parse_args()
+
+    store = SqlCandleStore(args.db, args.backend)
+    if args.command == "import":
+        frames = [pd.read_csv(path) for path in args.csv_files] or \
+            [CandleStore().read(args.symbol, args.interval)]
+        for df in frames:
+            store.upsert(args.symbol, args.interval, df)
+        print(f"🗄️  {store.count(args.symbol, args.interval):,} {args.symbol} {args.interval} candles in {args.db}")
+    elif args.command == "rollup":
+        print(store.rollup(args.name).to_string(index=False))
+    else:
+        print(store.query(args.sql).to_string(index=False))
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Vectorized candle integrity validator
+Checks every OHLCV invariant with whole-column NumPy expressions. Stored
+series are validated one memory-mapped month partition at a time, carrying
+the previous candle across partition boundaries, so series larger than RAM
+validate in bounded memory. The result is a compact anomaly report.
+"""
+
+import argparse
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from binance_api import interval_to_ms
+from candle_store import CandleStore, dataframe_to_columns
+from page_planner import align_down
+
+DEFAULT_JUMP_THRESHOLD = 0.2  # |log(open / previous close)| above this is a suspicious jump
+EXAMPLES = 5
+
+# check name -> (severity, description)
+CHECKS = {
+    'bad_price': ('error', "non-finite or non-positive price"),
+    'high_below_body': ('error', "high < max(open, close)"),
+    'low_above_body': ('error', "low > min(open, close)"),
+    'negative_volume': ('error', "negative volume, quote volume or taker volume"),
+    'taker_exceeds_volume': ('error', "taker buy volume > volume"),
+    'close_time_mismatch': ('error', "close_time != open_time + interval - 1ms"),
+    'misaligned': ('error', "open_time not on the interval grid"),
+    'non_monotonic': ('error', "open_time not strictly increasing (duplicate or out of order)"),
+    'gap': ('warning', "missing candles before this open_time"),
+    'price_jump': ('warning', "open far from the previous close (bad page?)"),
+    'zero_volume': ('warning', "zero-volume candle"),
+    'trades_volume_mismatch': ('warning', "volume without trades or trades without volume"),
+}
+
+
+class ValidationReport:
+    def __init__(self, interval):
+        self.interval = interval
+        self.rows = 0
+        self.first = None
+        self.last = None
+        self.counts = {name: 0 for name in CHECKS}
+        self.examples = {name: [] for name in CHECKS}  # First few offending open_times (ms)
+        self.missing_candles = 0
+        self.prev_open = None  # Carried across chunks
+        self.prev_close = None
+
+    @property
+    def errors(self):
+        return sum(count for name, count in self.counts.items() if CHECKS[name][0] == 'error')
+
+    @property
+    def warnings(self):
+        return sum(count for name, count in self.counts.items() if CHECKS[name][0] == 'warning')
+
+    @property
+    def ok(self):
+        return self.errors == 0
+
+    def anomalies(self):
+        """{check: count} for the checks that fired"""
+        return {name: count for name, count in self.counts.items() if count}
+
+    def summary(self):
+        status = "✅ valid" if self.ok else "❌ INVALID"
+        lines = [f"🔎 {self.rows:,} {self.interval} candles: {status} "
+                 f"({self.errors:,} error(s), {self.warnings:,} warning(s))"]
+        if self.rows:
+            lines.append(f"📅 From: {datetime.fromtimestamp(self.first / 1000)} "
+                         f"to {datetime.fromtimestamp(self.last / 1000)}")
+        for name, count in self.anomalies().items():
+            severity, description = CHECKS[name]
+            icon = "❌" if severity == 'error' else "⚠️ "
+            extra = f", {self.missing_candles:,} candles missing" if name == 'gap' else ""
+            examples = ", ".join(str(datetime.fromtimestamp(ms / 1000)) for ms in self.examples[name])
+            lines.append(f"   {icon} {name}: {count:,} ({description}{extra}) e.g. {examples}")
+        return "\n".join(lines)
+
+    def _record(self, name, mask, open_time):
+        hits = np.flatnonzero(mask)
+        if len(hits) == 0:
+            return
+        self.counts[name] += len(hits)
+        room = EXAMPLES - len(self.examples[name])
+        if room > 0:
+            self.examples[name].extend(int(ms) for ms in open_time[hits[:room]])
+
+    def update(self, columns, jump_threshold=DEFAULT_JUMP_THRESHOLD):
+        """Validate the next chunk of a series (typed column arrays, int64 ms times)"""
+        open_time = np.asarray(columns['open_time'], dtype=np.int64)
+        rows = len(open_time)
+        if rows == 0:
+            return self
+        step = interval_to_ms(self.interval)
+        o, h, l, c = (np.asarray(columns[name]) for name in ('open', 'high', 'low', 'close'))
+        volume = np.asarray(columns['volume'])
+        taker = np.asarray(columns['taker_buy_base_asset_volume'])
+        trades = np.asarray(columns['number_of_trades'])
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            prices = np.stack([o, h, l, c])
+            self._record('bad_price', ~np.all(np.isfinite(prices) & (prices > 0), axis=0), open_time)
+            self._record('high_below_body', h < np.maximum(o, c), open_time)
+            self._record('low_above_body', l > np.minimum(o, c), open_time)
+            self._record('negative_volume', (volume < 0) | (np.asarray(columns['quote_asset_volume']) < 0)
+                         | (taker < 0) | (np.asarray(columns['taker_buy_quote_asset_volume']) < 0), open_time)
+            self._record('taker_exceeds_volume', taker > volume * (1 + 1e-9), open_time)
+            self._record('close_time_mismatch',
+                         np.asarray(columns['close_time'], dtype=np.int64) != open_time + step - 1, open_time)
+            self._record('misaligned', open_time != align_down(open_time, self.interval), open_time)
+
+            # Row-to-row checks include the last candle of the previous chunk
+            if self.prev_open is not None:
+                previous_open = np.r_[self.prev_open, open_time[:-1]]
+                previous_close = np.r_[self.prev_close, c[:-1]]
+                current_open, current_times = o, open_time
+            else:
+                previous_open, previous_close = open_time[:-1], c[:-1]
+                current_open, current_times = o[1:], open_time[1:]
+            deltas = current_times - previous_open
+            self._record('non_monotonic', deltas <= 0, current_times)
+            holes = deltas > step
+            self._record('gap', holes, current_times)
+            self.missing_candles += int(np.sum(deltas[holes] // step - 1))
+            self._record('price_jump', np.abs(np.log(current_open / previous_close)) > jump_threshold,
+                         current_times)
+
+            self._record('zero_volume', volume == 0, open_time)
+            self._record('trades_volume_mismatch', (volume > 0) != (trades > 0), open_time)
+
+        self.rows += rows
+        self.first = int(open_time[0]) if self.first is None else min(self.first, int(open_time[0]))
+        self.last = int(open_time[-1]) if self.last is None else max(self.last, int(open_time[-1]))
+        self.prev_open = int(open_time[-1])
+        self.prev_close = float(c[-1])
+        return self
+
+
+def validate_columns(columns, interval, jump_threshold=DEFAULT_JUMP_THRESHOLD):
+    """Validate one set of typed column arrays"""
+    return ValidationReport(interval).update(columns, jump_threshold)
+
+
+def validate_dataframe(df, interval, jump_threshold=DEFAULT_JUMP_THRESHOLD):
+    """Validate convert_to_dataframe output (or a re-read crawler CSV)"""
+    return validate_columns(dataframe_to_columns(df), interval, jump_threshold)
+
+
+def validate_series(symbol, interval, store=None, jump_threshold=DEFAULT_JUMP_THRESHOLD):
+    """Validate a stored series partition by partition over memory-mapped columns"""
+    store = store or CandleStore()
+    report = ValidationReport(interval)
+    for month in store.partitions(symbol, interval):
+        report.update(store.read_partition(symbol, interval, month, mmap_mode='r'), jump_threshold)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check stored candles or crawler CSVs for integrity problems")
+    parser.add_argument("csv_files", nargs="*", help="Crawler CSVs (default: the stored series)")
+    parser.add_argument("--symbol", default="BTCUSDT")
+    parser.add_argument("--interval", default="1h")
+    parser.add_argument("--jump-threshold", type=float, default=DEFAULT_JUMP_THRESHOLD)
+    args = parser.parse_args()
+
+    reports = []
+    if args.csv_files:
+        for csv_file in args.csv_files:
+            print(f"📄 {csv_file}")
+            reports.append(validate_dataframe(pd.read_csv(csv_file), args.interval, args.jump_threshold))
+            print(reports[-1].summary())
+    else:
+        reports.append(validate_series(args.symbol, args.interval, jump_threshold=args.jump_threshold))
+        print(reports[-1].summary())
+
+    raise SystemExit(0 if all(report.ok for report in reports) else 1)
+
+
+if __name__ == "__main__":
+    main()
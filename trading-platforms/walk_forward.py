@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Walk-forward optimization of the SMA-crossover strategy
+The history is split into folds: each fold picks the best parameters on
+its in-sample window (rolling or anchored) and trades them on the
+following out-of-sample window. The out-of-sample windows are stitched
+into one position series and backtested once, fees included at every
+parameter switch.
+
+Nothing is recomputed per fold: SMAs are causal, so every window length
+is computed once over the full history (and reused by every combination
+using it), each combination is backtested once over the full history,
+and the in-sample score of every fold comes from prefix sums of that one
+return series in O(1). Combinations are spread over worker processes
+that attach to the candle columns in shared memory.
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from backtest_vectorized import YEAR_MS, load_bars, run_backtest, synthetic_bars
+from binance_api import interval_to_ms
+from param_sweep import SharedColumns, param_grid, parse_range
+
+OBJECTIVES = ('sharpe', 'total_return')
+
+_worker_columns = None  # Set in each worker by _init_worker
+_worker_segments = []
+_sma_cache = {}
+
+
+def _init_worker(spec):
+    global _worker_columns, _worker_segments
+    _worker_columns, _worker_segments = SharedColumns.attach(spec)
+    _sma_cache.clear()
+
+
+def _sma(close, length):
+    """SMA over the full history, computed once per worker and window length"""
+    if length not in _sma_cache:
+        if 'cumulative' not in _sma_cache:
+            _sma_cache['cumulative'] = np.cumsum(np.r_[0.0, close])
+        cumulative = _sma_cache['cumulative']
+        values = np.full(len(close), np.nan)
+        values[length - 1:] = (cumulative[length:] - cumulative[:-length]) / length
+        _sma_cache[length] = values
+    return _sma_cache[length]
+
+
+def cross_positions(close, fast, slow):
+    """+1 while SMA(fast) > SMA(slow), -1 below, 0 during warm-up"""
+    fast_sma, slow_sma = _sma(close, fast), _sma(close, slow)
+    with np.errstate(invalid='ignore'):
+        positions = np.sign(fast_sma - slow_sma)
+    positions[np.isnan(positions)] = 0.0
+    return positions
+
+
+def fold_windows(bars, folds, train_bars, anchored=False):
+    """
+    (in_sample_start, in_sample_end, oos_start, oos_end) index rows; the
+    out-of-sample windows tile everything after the first `train_bars`
+    """
+    test_bars = (bars - train_bars) // folds
+    if test_bars < 1:
+        raise ValueError(f"{bars:,} bars cannot hold {train_bars:,} training bars plus {folds} folds")
+    oos_start = train_bars + np.arange(folds) * test_bars
+    oos_end = np.r_[oos_start[1:], bars]
+    in_sample_start = np.zeros(folds, dtype=np.int64) if anchored else oos_start - train_bars
+    return np.column_stack([in_sample_start, oos_start, oos_start, oos_end])
+
+
+def window_scores(returns, starts, ends, objective, interval):
+    """Score of one return series over many windows at once, via prefix sums"""
+    if objective == 'total_return':
+        log_growth = np.r_[0.0, np.cumsum(np.log1p(returns))]
+        return np.expm1(log_growth[ends] - log_growth[starts])
+    first = np.r_[0.0, np.cumsum(returns)]
+    second = np.r_[0.0, np.cumsum(returns * returns)]
+    count = ends - starts
+    mean = (first[ends] - first[starts]) / count
+    variance = np.maximum((second[ends] - second[starts]) / count - mean * mean, 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sharpe = mean / np.sqrt(variance) * np.sqrt(YEAR_MS / interval_to_ms(interval))
+    return np.where(variance > 0, sharpe, 0.0)
+
+
+def _score_chunk(chunk, windows, objective, fee, slippage, interval):
+    """In-sample score of every fold for a chunk of parameter combinations"""
+    columns = _worker_columns
+    scores = []
+    for params in chunk:
+        positions = cross_positions(columns['close'], params['fast'], params['slow'])
+        result = run_backtest(columns['open'], columns['close'], positions, fee, slippage, interval=interval)
+        scores.append(window_scores(result.returns, windows[:, 0], windows[:, 1], objective, interval))
+    return scores
+
+
+class WalkForwardResult:
+    def __init__(self, folds, backtest, oos_start):
+        self.folds = folds  # One row per fold: windows, chosen parameters, scores
+        self.backtest = backtest  # Stitched out-of-sample BacktestResult
+        self.oos_start = oos_start  # Bar index of the first out-of-sample bar
+
+    @property
+    def equity(self):
+        """Stitched out-of-sample equity curve (starting at 1.0)"""
+        return self.backtest.equity
+
+    def summary(self):
+        changes = int((self.folds[['fast', 'slow']].diff().abs().sum(axis=1) > 0).sum())
+        return "\n".join([
+            f"🧩 Folds: {len(self.folds)} ({changes} parameter change(s))",
+            f"🎯 Mean in-sample score: {self.folds['in_sample_score'].mean():.2f}",
+            f"🧪 Out-of-sample folds with a gain: {(self.folds['oos_return'] > 0).mean():.0%}",
+            self.backtest.summary(),
+        ])
+
+
+def walk_forward(columns, grid, folds=60, train_bars=8760, anchored=False, objective='sharpe',
+                 fee=0.001, slippage=0.0005, interval='1h', workers=None, chunk_size=16, verbose=True):
+    """Walk-forward SMA-crossover optimization over `grid` (dicts with fast/slow)"""
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unknown objective {objective!r}; choose from {', '.join(OBJECTIVES)}")
+    columns = {'open': np.asarray(columns['open'], dtype=np.float64),
+               'close': np.asarray(columns['close'], dtype=np.float64),
+               'open_time': np.asarray(columns['open_time'], dtype=np.int64)}
+    bars = len(columns['close'])
+    windows = fold_windows(bars, folds, train_bars, anchored)
+    workers = workers or os.cpu_count() or 1
+
+    started = time.perf_counter()
+    chunks = [grid[i:i + chunk_size] for i in range(0, len(grid), chunk_size)]
+    with SharedColumns({'open': columns['open'], 'close': columns['close']}) as shared:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(shared.spec,)) as executor:
+            futures = [executor.submit(_score_chunk, chunk, windows, objective, fee, slippage, interval)
+                       for chunk in chunks]
+            scores = np.array([score for future in futures for score in future.result()])  # combos x folds
+    if verbose:
+        print(f"⚡ Scored {len(grid):,} combinations x {folds} folds in {time.perf_counter() - started:.2f}s")
+
+    # Best combination per fold, then one stitched out-of-sample position series
+    best = np.argmax(scores, axis=0)
+    _sma_cache.clear()
+    stitched = np.zeros(bars)
+    oos_returns = []
+    for fold, (oos_start, oos_end) in enumerate(windows[:, 2:]):
+        params = grid[best[fold]]
+        positions = cross_positions(columns['close'], params['fast'], params['slow'])
+        # The first out-of-sample fill happens at oos_start's open, so it is decided at the close before
+        stitched[oos_start - 1:oos_end] = positions[oos_start - 1:oos_end]
+    _sma_cache.clear()
+
+    first = windows[0, 2] - 1
+    backtest = run_backtest(columns['open'][first:], columns['close'][first:], stitched[first:], fee, slippage,
+                            open_time=columns['open_time'][first:], interval=interval)
+    equity = np.r_[1.0, backtest.equity]
+    for oos_start, oos_end in windows[:, 2:]:
+        oos_returns.append(equity[oos_end - first] / equity[oos_start - first] - 1)
+
+    times = pd.to_datetime(columns['open_time'], unit='ms')
+    fold_table = pd.DataFrame({
+        'fold': np.arange(folds),
+        'in_sample_start': times[windows[:, 0]],
+        'oos_start': times[windows[:, 2]],
+        'oos_end': times[windows[:, 3] - 1],
+        'fast': [grid[index]['fast'] for index in best],
+        'slow': [grid[index]['slow'] for index in best],
+        'in_sample_score': scores[best, np.arange(folds)],
+        'oos_return': oos_returns,
+    })
+    return WalkForwardResult(fold_table, backtest, int(windows[0, 2]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Walk-forward SMA-crossover optimization")
+    parser.add_argument("csv_file", nargs="?", help="Crawler CSV (default: the stored series)")
+    parser.add_argument("--symbol", default="BTCUSDT")
+    parser.add_argument("--interval", default="1h")
+    parser.add_argument("--fast", default="4:96:4", help="start:stop:step or a,b,c")
+    parser.add_argument("--slow", default="24:480:24")
+    parser.add_argument("--folds", type=int, default=60)
+    parser.add_argument("--train", type=int, default=8760, help="In-sample bars per fold")
+    parser.add_argument("--anchored", action="store_true", help="In-sample windows all start at the first bar")
+    parser.add_argument("--objective", choices=OBJECTIVES, default='sharpe')
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--synthetic", type=int, help="Use N synthetic 1m bars instead of the store")
+    parser.add_argument("--output", help="Write the stitched out-of-sample equity curve to this CSV")
+    args = parser.parse_args()
+
+    interval = args.interval
+    if args.synthetic:
+        bars, interval = synthetic_bars(args.synthetic), '1m'
+    elif args.csv_file:
+        from csv_cache import load_csv
+        df = load_csv(args.csv_file, columns=['open_time', 'open', 'close'])
+        bars = {'open_time': df['open_time'].to_numpy(dtype='datetime64[ms]').astype(np.int64),
+                'open': df['open'].to_numpy(), 'close': df['close'].to_numpy()}
+    else:
+        bars = load_bars(args.symbol, args.interval)
+    if len(bars['close']) == 0:
+        print(f"❌ No stored {args.symbol} {args.interval} candles")
+        return
+
+    grid = param_grid({'fast': parse_range(args.fast, int), 'slow': parse_range(args.slow, int)},
+                      where=lambda params: params['fast'] < params['slow'])
+    print(f"🔁 Walk-forward: {len(bars['close']):,} bars, {args.folds} folds, {args.train:,} in-sample bars "
+          f"({'anchored' if args.anchored else 'rolling'}), {len(grid):,} combinations")
+
+    started = time.perf_counter()
+    result = walk_forward(bars, grid, args.folds, args.train, args.anchored, args.objective,
+                          interval=interval, workers=args.workers)
+    print(f"⏱️  Total: {time.perf_counter() - started:.2f}s\n")
+    print(result.summary())
+    print(f"\n📋 Folds:\n{result.folds.tail(10).to_string(index=False)}")
+
+    if args.output:
+        times = pd.to_datetime(np.asarray(bars['open_time'])[result.oos_start - 1:], unit='ms')
+        pd.DataFrame({'open_time': times, 'equity': result.equity}).to_csv(args.output, index=False)
+        print(f"💾 Out-of-sample equity curve: {args.output}")
+
+
+if __name__ == "__main__":
+    main()